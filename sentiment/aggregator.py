@@ -0,0 +1,140 @@
+"""
+Incremental per-symbol sentiment aggregation
+Articles are folded in once, as deltas (ArticleStore.add); reads never rescan article scores.
+"""
+
+import math
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Half-life of the time-decayed mean: an article this much older weighs half as much
+DEFAULT_HALF_LIFE_HOURS = 24.0
+
+
+def sentiment_label(score: float) -> str:
+    """API label for an aggregated score."""
+    return "positive" if score > 0.1 else "negative" if score < -0.1 else "neutral"
+
+
+def article_key(article: Dict) -> Tuple[str, str]:
+    """Identity of a scraped article, used to apply it only once."""
+    return article.get("source", ""), article.get("title", "")
+
+
+def article_time(article: Dict) -> float:
+    """Publication time of an article (POSIX seconds), now if unknown."""
+    date = article.get("date")
+    return date.timestamp() if isinstance(date, datetime) else datetime.now().timestamp()
+
+
+def company_scores(article: Dict, result: Dict) -> List[Tuple[str, float]]:
+    """(company, score) for every company an article mentions.
+
+    Per-company scores (analyze_batch with a CompanyMatcher) take precedence over the
+    article score; companies found while scoring count as mentions too.
+    """
+    attributed = result.get("companies") or {}
+    companies = list(article["mentioned_companies"])
+    companies += [c for c in attributed if c not in companies]
+    return [(c, attributed[c]["score"] if c in attributed else result["score"]) for c in companies]
+
+
+class SymbolStats:
+    """Running count, sum, min/max and time-decayed mean of one symbol's article scores.
+
+    The stats cover every article added, with no time window; only the decayed mean favours
+    recent ones.
+
+    The decayed mean keeps decayed_sum / decayed_weight anchored at the newest article
+    time, so adding an article (in any order) is O(1) and reading needs no clock.
+    """
+
+    __slots__ = ("count", "total", "min", "max", "decayed_sum", "decayed_weight", "anchor")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = 0.0
+        self.max = 0.0
+        self.decayed_sum = 0.0
+        self.decayed_weight = 0.0
+        self.anchor: Optional[float] = None
+
+    def add(self, score: float, when: float, decay_rate: float) -> None:
+        """Add one score observed at `when` (POSIX seconds); decay_rate is ln(2) / half-life."""
+        if self.count == 0:
+            self.min = self.max = score
+        else:
+            self.min = min(self.min, score)
+            self.max = max(self.max, score)
+        self.count += 1
+        self.total += score
+
+        if self.anchor is None or when >= self.anchor:
+            # Move the anchor forward: older contributions lose weight
+            factor = math.exp(-decay_rate * (when - self.anchor)) if self.anchor is not None else 0.0
+            self.decayed_sum = self.decayed_sum * factor + score
+            self.decayed_weight = self.decayed_weight * factor + 1.0
+            self.anchor = when
+        else:
+            weight = math.exp(-decay_rate * (self.anchor - when))
+            self.decayed_sum += score * weight
+            self.decayed_weight += weight
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def decayed_mean(self) -> float:
+        return self.decayed_sum / self.decayed_weight if self.decayed_weight else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "score": round(self.mean, 3),
+            "label": sentiment_label(self.mean),
+            "mentions": self.count,
+            "min": round(self.min, 3),
+            "max": round(self.max, 3),
+            "decayed_score": round(self.decayed_mean, 3),
+        }
+
+
+class SentimentAggregator:
+    """Per-symbol SymbolStats of the tracked symbols and the /sentiment/all rows built from them.
+
+    Stats are computed incrementally by ArticleStore.add() and loaded with restore(); rows()
+    is rebuilt only after a restore(). Thread-safe.
+    """
+
+    def __init__(self, symbols: Iterable[str]):
+        self._stats: Dict[str, SymbolStats] = {symbol: SymbolStats() for symbol in symbols}
+        self._lock = threading.Lock()
+        self._rows: Optional[List[Dict]] = None
+        self.mentioned = 0
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._stats
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def restore(self, stats: Dict[str, SymbolStats]) -> None:
+        """Replace the stats of tracked symbols (e.g. loaded from an ArticleStore)."""
+        with self._lock:
+            for symbol, symbol_stats in stats.items():
+                if symbol in self._stats:
+                    self._stats[symbol] = symbol_stats
+            self.mentioned = sum(1 for symbol_stats in self._stats.values() if symbol_stats.count)
+            self._rows = None
+
+    def rows(self) -> List[Dict]:
+        """One row per symbol, most mentioned first; cached until the next restore()."""
+        rows = self._rows
+        if rows is None:
+            with self._lock:
+                rows = [{"symbol": symbol, **stats.to_dict()} for symbol, stats in self._stats.items()]
+                rows.sort(key=lambda row: row["mentions"], reverse=True)
+                self._rows = rows
+        return rows
@@ -3,10 +3,26 @@ Sentiment Analyzer for Tunisian Stock Market News - Windows Compatible
 Supports French, Arabic, English. Includes explainability and context-aware scoring.
 """
 
+import hashlib
 import re
 import sys
 import io
-from typing import Dict, List, Tuple, Any
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Callable, Dict, List, Tuple, Any, Mapping, Optional
+
+from companies import CompanyMatcher
+from tokens import PUNCTUATION, TokenIndex, phrase_tokens
+
+_URL_RE = re.compile(r"http\S+|www\S+|https\S+", re.MULTILINE)
+_HTML_TAG_RE = re.compile(r"<.*?>")
+_NON_TEXT_RE = re.compile(r"[^\w\s\u0600-\u06FF\u00C0-\u017F.,!?;:\'-]")
+# Same whitelist as _NON_TEXT_RE for pure-ASCII text, applied by str.translate
+_ASCII_NON_TEXT_TABLE = str.maketrans({chr(i): " " for i in range(128) if _NON_TEXT_RE.match(chr(i))})
+_FRENCH_CHARS = frozenset("éèêëàâäôöûüçÉÈÊËÀÂÄÔÖÛÜÇ")
+# Tokens after a negation/context modifier whose keyword hits are flipped (scope ends at punctuation)
+NEGATION_WINDOW = 3
 
 
 def _windows_utf8_stdout():
@@ -30,6 +46,188 @@ def _is_arabic_char(c: str) -> bool:
     )
 
 
+class Lexicon:
+    """Immutable, precompiled keyword tables shared by every call and every analyzer instance.
+
+    Build through Lexicon.build(): identical tables return the same cached object, so the
+    tables are compiled once per process. Every pattern (sentiment keywords, neutral words,
+    neutral-context indicators, context modifiers) is stored as a token phrase keyed by its
+    first token, so one pass over a document's distinct tokens finds all of them, on whole
+    words only.
+    """
+
+    __slots__ = (
+        "entries", "keyword_index", "phrases_by_first", "neutral_words", "neutral_indicators",
+        "context_modifiers", "modifier_lengths", "positive_neutral_context_words", "version",
+    )
+
+    # Recently built lexicons, shared by analyzers with the same tables. Bounded: every
+    # update_company_keywords() builds a new one, and old versions must not pile up.
+    _cache: "OrderedDict[tuple, Lexicon]" = OrderedDict()
+    _CACHE_SIZE = 8
+    _cache_lock = threading.Lock()
+
+    def __init__(self, key: tuple):
+        pos_list, neg_list, neutral_words, neutral_indicators, context_modifiers, pnc_words, companies = key
+        # Entries are (word, lang, polarity, symbol) in the order the per-keyword loops used,
+        # so hits can be replayed in that order.
+        entries: List[Tuple[str, str, str, Optional[str]]] = [(w, lang, "positive", None) for w, lang in pos_list]
+        entries += [(w, lang, "negative", None) for w, lang in neg_list]
+        for symbol, positive, negative in companies:
+            entries += [(w, "company", "positive", symbol) for w in positive]
+            entries += [(w, "company", "negative", symbol) for w in negative]
+        index: Dict[str, List[int]] = {}
+        for i, (word, _, _, _) in enumerate(entries):
+            index.setdefault(word, []).append(i)
+
+        set_ = object.__setattr__
+        set_(self, "entries", tuple(entries))
+        set_(self, "keyword_index", MappingProxyType({w: tuple(ids) for w, ids in index.items()}))
+        set_(self, "neutral_words", neutral_words)
+        set_(self, "neutral_indicators", neutral_indicators)
+        set_(self, "context_modifiers", context_modifiers)
+        set_(self, "positive_neutral_context_words", frozenset(pnc_words))
+        phrases_by_first: Dict[str, List[Tuple[str, Tuple[str, ...]]]] = {}
+        for pattern in dict.fromkeys(list(index) + list(neutral_words) + list(neutral_indicators) + list(context_modifiers)):
+            phrase = phrase_tokens(pattern)
+            if phrase:
+                phrases_by_first.setdefault(phrase[0], []).append((pattern, phrase))
+        set_(self, "phrases_by_first", MappingProxyType({t: tuple(p) for t, p in phrases_by_first.items()}))
+        set_(self, "modifier_lengths", MappingProxyType({m: len(phrase_tokens(m)) for m in context_modifiers}))
+        set_(self, "version", hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:12])
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Lexicon is immutable")
+
+    @classmethod
+    def build(
+        cls,
+        pos_list: List[Tuple[str, str]],
+        neg_list: List[Tuple[str, str]],
+        neutral_words: List[str],
+        neutral_indicators: List[str],
+        context_modifiers: List[str],
+        positive_neutral_context_words: List[str],
+        company_keywords: Mapping[str, Mapping[str, List[str]]],
+    ) -> "Lexicon":
+        """Return the shared Lexicon for these tables, compiling it unless recently built."""
+        key = (
+            tuple(pos_list),
+            tuple(neg_list),
+            tuple(neutral_words),
+            tuple(neutral_indicators),
+            tuple(context_modifiers),
+            tuple(positive_neutral_context_words),
+            tuple((s, tuple(kw["positive"]), tuple(kw["negative"])) for s, kw in company_keywords.items()),
+        )
+        with cls._cache_lock:
+            lexicon = cls._cache.get(key)
+            if lexicon is None:
+                lexicon = cls._cache[key] = cls(key)
+            cls._cache.move_to_end(key)
+            while len(cls._cache) > cls._CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        return lexicon
+
+    def find(self, index: TokenIndex) -> Dict[str, List[int]]:
+        """Return {pattern: token start positions} for every lexicon pattern in the document."""
+        found: Dict[str, List[int]] = {}
+        phrases_by_first = self.phrases_by_first
+        for token in index.positions:
+            for pattern, phrase in phrases_by_first.get(token, ()):
+                starts = index.find(phrase)
+                if starts:
+                    found[pattern] = starts
+        return found
+
+    def negation_scopes(self, index: TokenIndex, found: Dict[str, List[int]]) -> Dict[int, str]:
+        """Return {token position: modifier} for the NEGATION_WINDOW tokens after each modifier found.
+
+        A scope stops at punctuation; a position in several scopes keeps the nearest modifier.
+        """
+        scopes: Dict[int, Tuple[int, str]] = {}
+        tokens = index.tokens
+        for modifier, length in self.modifier_lengths.items():
+            for start in found.get(modifier, ()):
+                end = start + length
+                for i in range(end, min(end + NEGATION_WINDOW, len(tokens))):
+                    if tokens[i] in PUNCTUATION:
+                        break
+                    if i not in scopes or start > scopes[i][0]:
+                        scopes[i] = (start, modifier)
+        return {i: modifier for i, (_, modifier) in scopes.items()}
+
+
+def _copy_result(value: Any) -> Any:
+    """Copy of a result's dicts and lists (the other values in results are immutable)."""
+    if isinstance(value, dict):
+        return {key: _copy_result(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_result(item) for item in value]
+    return value
+
+
+class ResultCache:
+    """Bounded LRU cache of analysis results keyed by content hash, with hit/miss counters.
+
+    Thread-safe. Stored and returned results are copies down to nested dicts and lists
+    (explanation_detail, companies), so callers may change a result without touching the
+    cache. max_entries=0 disables caching.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Entries and the lock stay in this process; a copy starts empty
+        return {"max_entries": self.max_entries}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state["max_entries"])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Optional[bytes]) -> Optional[Dict]:
+        if key is None:
+            return None
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _copy_result(result)
+
+    def put(self, key: Optional[bytes], result: Dict) -> None:
+        if key is None:
+            return
+        with self._lock:
+            self._entries[key] = _copy_result(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
 def get_sentiment_intensity(score: float) -> str:
     """Return human-readable intensity level for a sentiment score."""
     if score > 0.8:
@@ -53,9 +251,13 @@ def get_sentiment_intensity(score: float) -> str:
 
 
 class SentimentAnalyzer:
-    def __init__(self):
-        """Initialize keyword-based sentiment analyzer (fast, no ML dependencies)"""
+    def __init__(self, cache_size: int = 10000):
+        """Initialize keyword-based sentiment analyzer (fast, no ML dependencies)
+
+        cache_size bounds the result cache (entries, LRU eviction); 0 disables it.
+        """
         print("Using keyword-based sentiment analyzer (fast for Windows)")
+        self.cache = ResultCache(cache_size)
 
         # French keywords
         self.fr_positive = [
@@ -116,6 +318,11 @@ class SentimentAnalyzer:
             "maintained", "overall", "résultats", "results", "context"
         ]
 
+        # Indicators of a stable/neutral context (e.g. "performances stables")
+        self.neutral_indicators = [
+            "stable", "stables", "stabilité", "maintain", "maintien", "pas de changement", "no change", "mixed", "مستقر"
+        ]
+
         # Context modifiers: phrases that negate or soften nearby sentiment
         self.context_modifiers = [
             "pas de", "pas d'", "sans", "aucun", "aucune", "لا يوجد", "no ", "not ",
@@ -141,6 +348,46 @@ class SentimentAnalyzer:
             }
         }
 
+        self.lexicon = self._build_lexicon()
+
+    def refresh_lexicon(self) -> None:
+        """Recompile the lexicon after editing keyword tables in place.
+
+        Cache keys include the lexicon version, so results scored with the old tables are
+        never served again; the cache is also emptied to free their memory.
+        """
+        lexicon = self._build_lexicon()
+        if lexicon is not self.lexicon:
+            self.lexicon = lexicon
+            self.cache.clear()
+
+    def update_company_keywords(self, symbol: str, positive: List[str] = None, negative: List[str] = None) -> None:
+        """Set company-specific positive/negative keywords for a symbol and refresh the lexicon."""
+        company_data = self.company_keywords.setdefault(symbol, {"positive": [], "negative": []})
+        if positive is not None:
+            company_data["positive"] = list(positive)
+        if negative is not None:
+            company_data["negative"] = list(negative)
+        self.refresh_lexicon()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # The compiled lexicon is not sent to other processes; it is rebuilt (once per process) on load
+        del state["lexicon"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.lexicon = self._build_lexicon()
+
+    def _build_lexicon(self) -> Lexicon:
+        """Return the shared precompiled lexicon for this analyzer's keyword tables."""
+        pos_list, neg_list = self._get_keywords_with_language()
+        return Lexicon.build(
+            pos_list, neg_list, self.neutral_words, self.neutral_indicators,
+            self.context_modifiers, self.positive_neutral_context_words, self.company_keywords,
+        )
+
     def detect_language_simple(self, text: str) -> str:
         """Simple language detection for Windows compatibility"""
         if not text:
@@ -148,20 +395,27 @@ class SentimentAnalyzer:
         sample = text[:200]
         if any(_is_arabic_char(c) for c in sample):
             return "ar"
-        french_chars = set("éèêëàâäôöûüçÉÈÊËÀÂÄÔÖÛÜÇ")
-        if any(c in french_chars for c in sample):
+        if any(c in _FRENCH_CHARS for c in sample):
             return "fr"
         return "en"
 
     def clean_text(self, text: str) -> str:
-        """Clean text for analysis"""
+        """Clean text for analysis: drop URLs and HTML tags, replace non-whitelisted characters
+        with spaces, collapse whitespace.
+
+        URL/tag removal only runs when the text can contain them, and pure-ASCII text goes
+        through a translate table instead of the character-class regex.
+        """
         if not text:
             return ""
-        text = re.sub(r"http\S+|www\S+|https\S+", "", text, flags=re.MULTILINE)
-        text = re.sub(r"<.*?>", "", text)
-        text = re.sub(r"[^\w\s\u0600-\u06FF\u00C0-\u017F.,!?;:\'-]", " ", text)
-        text = " ".join(text.split())
-        return text
+        if "<" in text or "http" in text or "www" in text:
+            text = _URL_RE.sub("", text)
+            text = _HTML_TAG_RE.sub("", text)
+        if text.isascii():
+            text = text.translate(_ASCII_NON_TEXT_TABLE)
+        else:
+            text = _NON_TEXT_RE.sub(" ", text)
+        return " ".join(text.split())
 
     def _get_keywords_with_language(self) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
         """Return (positive_list, negative_list) where each item is (word, lang)."""
@@ -174,18 +428,9 @@ class SentimentAnalyzer:
         neg += [(w, "en") for w in self.en_negative]
         return pos, neg
 
-    def _has_neutral_context_for_performance(self, text_lower: str) -> bool:
+    def _has_neutral_context_for_performance(self, hits: Dict[str, List[int]]) -> bool:
         """True if text suggests neutral context (e.g. 'performances stables', 'stable performance')."""
-        neutral_indicators = ["stable", "stables", "stabilité", "maintain", "maintien", "pas de changement", "no change", "mixed", "مستقر"]
-        return any(n in text_lower for n in neutral_indicators)
-
-    def _apply_context_dampening(self, text_lower: str, positive_count: int, negative_count: int) -> Tuple[int, int]:
-        """Reduce counts when negation/context modifiers present."""
-        has_modifier = any(m in text_lower for m in self.context_modifiers)
-        if not has_modifier:
-            return positive_count, negative_count
-        # Dampen both so we don't over-penalize; pull toward neutral
-        return int(positive_count * 0.7), int(negative_count * 0.7)
+        return any(n in hits for n in self.lexicon.neutral_indicators)
 
     def _build_explanation(
         self,
@@ -330,96 +575,112 @@ class SentimentAnalyzer:
         }
         return simple_explanation, explanation_detail
 
-    def analyze_sentiment(self, text: str, stock_symbol: str = None) -> Dict:
-        """Analyze sentiment with context awareness; returns score, label, explanation (backward compatible)."""
-        cleaned_text = self.clean_text(text)
-        if len(cleaned_text) < 10:
-            return {
-                "score": 0.0,
-                "label": "neutral",
-                "confidence": 0.0,
-                "explanation": "Text too short to analyze.",
-                "explanation_detail": None,
-                "positive_keywords": 0,
-                "negative_keywords": 0,
-                "method": "keyword_based",
-            }
-
-        text_lower = cleaned_text.lower()
-        pos_list, neg_list = self._get_keywords_with_language()
-        has_neutral_context = self._has_neutral_context_for_performance(text_lower)
+    def _find_keywords(
+        self, cleaned_text: str, stock_symbol: str = None, index: TokenIndex = None
+    ) -> Tuple[List[Tuple[str, str, int]], List[Tuple[str, str, int]], List[str], Dict[str, List[int]]]:
+        """Index cleaned text once; return (positive_found, negative_found, neutral_found, hits).
+
+        hits maps each lexicon pattern found to its token start positions. Keyword hits that
+        start within NEGATION_WINDOW tokens after a context modifier count for the opposite
+        polarity and are reported as "<modifier> <keyword>" (e.g. "pas de croissance").
+        index is the TokenIndex of cleaned_text if the caller already built one.
+        """
+        lexicon = self.lexicon
+        # One pass over the document's tokens finds every lexicon pattern: keywords, neutral
+        # words, indicators and modifiers, on word boundaries only
+        if index is None:
+            index = TokenIndex(cleaned_text)
+        hits = lexicon.find(index)
+        scopes = lexicon.negation_scopes(index, hits) if hits else {}
+        positive_found, negative_found, neutral_found = self._count_hits(hits, scopes, stock_symbol)
+        return positive_found, negative_found, neutral_found, hits
+
+    def _count_hits(
+        self, hits: Dict[str, List[int]], scopes: Dict[int, str], stock_symbol: str = None
+    ) -> Tuple[List[Tuple[str, str, int]], List[Tuple[str, str, int]], List[str]]:
+        """(positive_found, negative_found, neutral_found) for lexicon hits and negation scopes."""
+        lexicon = self.lexicon
+        has_neutral_context = self._has_neutral_context_for_performance(hits)
 
         # Neutral words found (track only, don't add to score)
-        neutral_found: List[str] = []
-        for w in self.neutral_words:
-            if w in text_lower:
-                neutral_found.append(w)
+        neutral_found = [w for w in lexicon.neutral_words if w in hits]
 
         positive_found: List[Tuple[str, str, int]] = []
         negative_found: List[Tuple[str, str, int]] = []
 
-        for word, lang in pos_list:
-            # Skip "performance(s)" when text has stable/neutral context
-            if word in self.positive_neutral_context_words and has_neutral_context:
-                continue
-            if word in text_lower:
-                n = min(text_lower.count(word), 3)
-                positive_found.append((word, lang, n))
-
-        for word, lang in neg_list:
-            if word in text_lower:
-                n = min(text_lower.count(word), 3)
-                negative_found.append((word, lang, n))
-
-        if stock_symbol and stock_symbol in self.company_keywords:
-            company_data = self.company_keywords[stock_symbol]
-            for word in company_data["positive"]:
+        # Keyword hits are replayed in lexicon order so the found lists keep the order of the
+        # former per-keyword loops
+        keyword_index = lexicon.keyword_index
+        hit_ids = sorted(i for word in hits if word in keyword_index for i in keyword_index[word])
+        for i in hit_ids:
+            word, lang, polarity, symbol = lexicon.entries[i]
+            if symbol is None:
+                # Skip "performance(s)" when text has stable/neutral context
+                if polarity == "positive" and word in lexicon.positive_neutral_context_words and has_neutral_context:
+                    continue
+                weight = 1
+            elif symbol == stock_symbol:
                 # In neutral context (e.g. "secteur immobilier", "performances stables"), don't count sector terms as positive
-                if has_neutral_context:
+                if polarity == "positive" and has_neutral_context:
                     continue
-                if word in text_lower:
-                    n = min(text_lower.count(word), 3)
-                    positive_found.append((word, "company", n * 2))
-            for word in company_data["negative"]:
-                if word in text_lower:
-                    n = min(text_lower.count(word), 3)
-                    negative_found.append((word, "company", n * 2))
-
-        positive_count = sum(w for _, _, w in positive_found)
-        negative_count = sum(w for _, _, w in negative_found)
+                lang, weight = "company", 2
+            else:
+                continue
 
-        # Context dampening (negation phrases)
-        positive_count, negative_count = self._apply_context_dampening(text_lower, positive_count, negative_count)
+            same, flipped = (positive_found, negative_found) if polarity == "positive" else (negative_found, positive_found)
+            positions = hits[word]
+            negated: Dict[str, int] = {}
+            if scopes:
+                for p in positions:
+                    if p in scopes:
+                        modifier = scopes[p]
+                        negated[modifier] = negated.get(modifier, 0) + 1
+            plain = len(positions) - sum(negated.values())
+            if plain:
+                same.append((word, lang, min(plain, 3) * weight))
+            for modifier, n in negated.items():
+                flipped.append((f"{modifier.strip()} {word}", lang, min(n, 3) * weight))
+
+        return positive_found, negative_found, neutral_found
+
+    def _attribute(
+        self, index: TokenIndex, hits: Dict[str, List[int]], companies: CompanyMatcher, result: Dict
+    ) -> Dict[str, Dict]:
+        """Per-company sentiment of a document: each mentioned company is scored on the
+        sentences that mention it (with its own company keywords), or gets the document's
+        score when those sentences have no sentiment keywords.
+
+        index must keep case; result is the document's own result.
+        """
+        mentions = companies.find_index(index)
+        if not mentions:
+            return {}
+        scopes = self.lexicon.negation_scopes(index, hits) if hits else {}
+        attributed: Dict[str, Dict] = {}
+        for symbol, positions in mentions.items():
+            sentences = set()
+            for start, end in {index.sentence(p) for p in positions}:
+                sentences.update(range(start, end))
+            local: Dict[str, List[int]] = {}
+            for word, word_positions in hits.items():
+                inside = [p for p in word_positions if p in sentences]
+                if inside:
+                    local[word] = inside
+            positive_found, negative_found, _ = self._count_hits(local, scopes, symbol)
+            positive_count = sum(w for _, _, w in positive_found)
+            negative_count = sum(w for _, _, w in negative_found)
+            if positive_count + negative_count:
+                score, label, _ = self._score_counts(positive_count, negative_count)
+                score, scope = round(score, 3), "sentence"
+            else:
+                score, label, scope = result["score"], result["label"], "article"
+            attributed[symbol] = {"score": score, "label": label, "mentions": len(positions), "scope": scope}
+        return attributed
+
+    @staticmethod
+    def _score_counts(positive_count: int, negative_count: int) -> Tuple[float, str, float]:
+        """Return (normalized_score, label, confidence) for non-zero keyword counts."""
         total = positive_count + negative_count
-
-        if total == 0:
-            summary = "Neutral sentiment. No strong sentiment keywords found; context suggests stable or mixed outlook."
-            empty_detail = {
-                "summary": summary,
-                "intensity": "Neutral",
-                "key_findings": ["No sentiment keywords detected; neutral/stable context."],
-                "keyword_breakdown": {
-                    "positive_keywords": [],
-                    "negative_keywords": [],
-                    "positive": {"count": 0, "top_terms": []},
-                    "negative": {"count": 0, "top_terms": []},
-                    "neutral": {"count": len(neutral_found), "top_terms": neutral_found[:5]},
-                },
-                "language_analysis": {},
-                "sector_insights": None,
-                "recommendation": "Mixed or neutral outlook; monitor for further developments.",
-            }
-            return {
-                "score": 0.0,
-                "label": "neutral",
-                "confidence": 0.5,
-                "explanation": summary,
-                "explanation_detail": empty_detail,
-                "positive_keywords": 0,
-                "negative_keywords": 0,
-                "method": "keyword_based",
-            }
-
         score = (positive_count - negative_count) / total
         normalized_score = max(-1.0, min(1.0, score))
 
@@ -439,11 +700,83 @@ class SentimentAnalyzer:
         else:
             label = "neutral"
             confidence = 0.5
+        return normalized_score, label, confidence
+
+    @staticmethod
+    def _short_text_result(attributed: bool = False) -> Dict:
+        result = {
+            "score": 0.0,
+            "label": "neutral",
+            "confidence": 0.0,
+            "explanation": "Text too short to analyze.",
+            "explanation_detail": None,
+            "positive_keywords": 0,
+            "negative_keywords": 0,
+            "method": "keyword_based",
+        }
+        if attributed:
+            result["companies"] = {}
+        return result
 
-        explanation, explanation_detail = self._build_explanation(
-            positive_found, negative_found, neutral_found,
-            normalized_score, label, total, stock_symbol
-        )
+    @staticmethod
+    def _neutral_result(neutral_found: List[str], explain: bool = True) -> Dict:
+        if not explain:
+            return {
+                "score": 0.0,
+                "label": "neutral",
+                "confidence": 0.5,
+                "explanation": None,
+                "explanation_detail": None,
+                "positive_keywords": 0,
+                "negative_keywords": 0,
+                "method": "keyword_based",
+            }
+        summary = "Neutral sentiment. No strong sentiment keywords found; context suggests stable or mixed outlook."
+        empty_detail = {
+            "summary": summary,
+            "intensity": "Neutral",
+            "key_findings": ["No sentiment keywords detected; neutral/stable context."],
+            "keyword_breakdown": {
+                "positive_keywords": [],
+                "negative_keywords": [],
+                "positive": {"count": 0, "top_terms": []},
+                "negative": {"count": 0, "top_terms": []},
+                "neutral": {"count": len(neutral_found), "top_terms": neutral_found[:5]},
+            },
+            "language_analysis": {},
+            "sector_insights": None,
+            "recommendation": "Mixed or neutral outlook; monitor for further developments.",
+        }
+        return {
+            "score": 0.0,
+            "label": "neutral",
+            "confidence": 0.5,
+            "explanation": summary,
+            "explanation_detail": empty_detail,
+            "positive_keywords": 0,
+            "negative_keywords": 0,
+            "method": "keyword_based",
+        }
+
+    def _scored_result(
+        self,
+        positive_found: List[Tuple[str, str, int]],
+        negative_found: List[Tuple[str, str, int]],
+        neutral_found: List[str],
+        positive_count: int,
+        negative_count: int,
+        normalized_score: float,
+        label: str,
+        confidence: float,
+        stock_symbol: str = None,
+        explain: bool = True,
+    ) -> Dict:
+        explanation, explanation_detail = None, None
+        if explain:
+            explanation, explanation_detail = self._build_explanation(
+                positive_found, negative_found, neutral_found,
+                normalized_score, label, positive_count + negative_count, stock_symbol
+            )
 
         return {
             "score": round(normalized_score, 3),
@@ -456,6 +789,112 @@ class SentimentAnalyzer:
             "method": "keyword_based",
         }
 
+    def _analyze_cleaned(
+        self, cleaned_text: str, stock_symbol: str = None, explain: bool = True, companies: CompanyMatcher = None
+    ) -> Dict:
+        """Score text that already went through clean_text (and is long enough to analyze)."""
+        index = TokenIndex(cleaned_text, keep_case=companies is not None)
+        positive_found, negative_found, neutral_found, hits = self._find_keywords(cleaned_text, stock_symbol, index)
+        positive_count = sum(w for _, _, w in positive_found)
+        negative_count = sum(w for _, _, w in negative_found)
+
+        if positive_count + negative_count == 0:
+            result = self._neutral_result(neutral_found, explain)
+        else:
+            normalized_score, label, confidence = self._score_counts(positive_count, negative_count)
+            result = self._scored_result(
+                positive_found, negative_found, neutral_found, positive_count, negative_count,
+                normalized_score, label, confidence, stock_symbol, explain
+            )
+        if companies is not None:
+            result["companies"] = self._attribute(index, hits, companies, result)
+        return result
+
+    def _result_key(
+        self, cleaned_text: str, stock_symbol: Optional[str], explain: bool, companies: CompanyMatcher = None
+    ) -> Optional[bytes]:
+        """Cache key: hash of (cleaned text, stock symbol, explain, lexicon and company matcher
+        versions); None if caching is off."""
+        if not self.cache.max_entries:
+            return None
+        matcher = companies.version if companies is not None else ""
+        raw = f"{self.lexicon.version}\x1f{matcher}\x1f{stock_symbol or ''}\x1f{int(explain)}\x1f{cleaned_text}"
+        return hashlib.sha1(raw.encode("utf-8")).digest()
+
+    def analyze_sentiment(
+        self, text: str, stock_symbol: str = None, explain: bool = True, companies: CompanyMatcher = None
+    ) -> Dict:
+        """Analyze sentiment with context awareness; returns score, label, explanation (backward compatible).
+
+        With explain=False the explanation and explanation_detail fields are None and are never
+        built, which is all aggregate callers need. With a CompanyMatcher, the result also has
+        "companies": {symbol: {score, label, mentions, scope}} for the companies mentioned,
+        found on the same tokens as the keywords (see _attribute). Results are served from
+        self.cache when the same cleaned text was already scored with the current lexicon.
+        """
+        cleaned_text = self.clean_text(text)
+        if len(cleaned_text) < 10:
+            return self._short_text_result(companies is not None)
+
+        key = self._result_key(cleaned_text, stock_symbol, explain, companies)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._analyze_cleaned(cleaned_text, stock_symbol, explain, companies)
+            self.cache.put(key, result)
+        return result
+
+    def _prepare_batch(
+        self, texts: List[str], stock_symbols: List[Optional[str]], explain: bool, companies: CompanyMatcher = None
+    ) -> Tuple[List[Optional[Dict]], List[Tuple[int, str, Optional[bytes]]]]:
+        """Resolve too-short and cached texts; return (results, pending) where pending holds
+        (index, cleaned_text, cache_key) for texts that still need scoring."""
+        results: List[Optional[Dict]] = [None] * len(texts)
+        pending: List[Tuple[int, str, Optional[bytes]]] = []
+        for d, (text, symbol) in enumerate(zip(texts, stock_symbols)):
+            cleaned_text = self.clean_text(text)
+            if len(cleaned_text) < 10:
+                results[d] = self._short_text_result(companies is not None)
+                continue
+            key = self._result_key(cleaned_text, symbol, explain, companies)
+            results[d] = self.cache.get(key)
+            if results[d] is None:
+                pending.append((d, cleaned_text, key))
+        return results, pending
+
+    def _store_batch(self, pending: List[Tuple[int, str, Optional[bytes]]], results: List[Dict]) -> None:
+        for d, _, key in pending:
+            self.cache.put(key, results[d])
+
+    def analyze_batch(
+        self,
+        texts: List[str],
+        stock_symbols: Optional[List[Optional[str]]] = None,
+        explain: bool = True,
+        companies: CompanyMatcher = None,
+        score_misses: Callable[[List[str], List[Optional[str]]], List[Dict]] = None,
+    ) -> List[Dict]:
+        """Analyze many texts at once; returns exactly what analyze_sentiment returns per text.
+
+        Texts are cleaned and looked up in the result cache first. The others are scored by
+        this analyzer, or by score_misses(texts, stock_symbols) if given (AnalysisPool sends
+        them to its workers), and cached. explain, companies and caching are as in
+        analyze_sentiment.
+        """
+        if stock_symbols is None:
+            stock_symbols = [None] * len(texts)
+        elif len(stock_symbols) != len(texts):
+            raise ValueError("stock_symbols must have one entry per text")
+
+        results, pending = self._prepare_batch(texts, stock_symbols, explain, companies)
+        if score_misses is not None and pending:
+            scored = score_misses([texts[d] for d, _, _ in pending], [stock_symbols[d] for d, _, _ in pending])
+        else:
+            scored = [self._analyze_cleaned(cleaned, stock_symbols[d], explain, companies) for d, cleaned, _ in pending]
+        for (d, _, _), result in zip(pending, scored):
+            results[d] = result
+        self._store_batch(pending, results)
+        return results
+
 
 def test_analyzer_windows():
     """Test the sentiment analyzer on Windows"""
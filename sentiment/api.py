@@ -4,64 +4,450 @@ Simple working API - Scrape → Analyze → Serve
 No complexity, just working endpoints
 """
 
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+import gzip
+import hashlib
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import Body, FastAPI, Query, Request, Response
 import json
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from pydantic import BaseModel
 
-app = FastAPI(title="BVMT Sentiment", version="2.0")
+try:
+    import orjson
+except ImportError:  # optional: response bodies are encoded with the json module instead
+    orjson = None
 
-# Global cache - populated on first request
-_data_cache = None
+try:
+    import brotli
+except ImportError:  # optional: responses are compressed with gzip only
+    brotli = None
 
+# Seconds between background refreshes (BVMT_REFRESH_INTERVAL); 0 builds on first request only
+REFRESH_INTERVAL = float(os.environ.get("BVMT_REFRESH_INTERVAL", "900"))
+# Snapshot older than this is still served, but triggers a refresh in the background
+SNAPSHOT_TTL = float(os.environ.get("BVMT_SNAPSHOT_TTL", "600"))
+# Snapshot older than this is never served: the request waits for a fresh one
+SNAPSHOT_MAX_STALE = float(os.environ.get("BVMT_SNAPSHOT_MAX_STALE", "3600"))
+# How often a worker checks whether another worker stored new data (seconds)
+STORE_POLL_INTERVAL = 1.0
+# Content codings offered for large responses, preferred first
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+# Bodies smaller than this (bytes) are sent uncompressed
+COMPRESS_MIN_SIZE = 1024
+# Fields POST /sentiment/batch can project ("symbol" is always returned)
+BATCH_FIELDS = ("symbol", "score", "label", "mentions", "min", "max", "decayed_score", "company", "sector")
 
-def _get_data():
-    """Get or create cached data"""
-    global _data_cache
+
+@asynccontextmanager
+async def lifespan(app):
+    """Start the background refresh with the server; on shutdown stop it and the analysis pool."""
+    start_background_refresh()
+    yield
+    stop_background_refresh()
+    _close_pool()
+
+
+app = FastAPI(title="BVMT Sentiment", version="2.0", lifespan=lifespan)
+
+# Last good snapshot, replaced as a whole by each refresh (readers never see a partial one)
+_snapshot = None
+_generation = 0
+# max_age the current snapshot was built with (inf for a reload of what another worker stored)
+_snapshot_max_age = float("inf")
+# Single flight: at most one refresh builds at a time
+_refresh_lock = threading.Lock()
+_refresh_thread = None
+_stop_refresh = threading.Event()
+# Held while a stale-triggered background refresh is pending
+_revalidate_lock = threading.Lock()
+
+# Shared analyzer: its compiled lexicon and result cache survive refreshes
+_analyzer = None
+
+# Analysis worker processes, started by the first parallel refresh and kept until shutdown
+_pool = None
+
+# Scraper reused across refreshes (HTTP session, compiled source profiles, company matcher)
+_scraper = None
+
+# Articles, mentions and aggregates on disk, shared by all worker processes
+_store = None
+# When this process last checked the store for other workers' writes (monotonic)
+_store_checked = 0.0
+
+# Persistent index of scored articles (URL + content fingerprint), shared across runs
+_dedup = None
+
+
+def _get_analyzer():
+    """Get or create the shared analyzer"""
+    global _analyzer
+    if _analyzer is None:
+        from analyzer import SentimentAnalyzer
+        _analyzer = SentimentAnalyzer()
+    return _analyzer
+
+
+def _get_pool():
+    """Get or create the analysis pool (BVMT_ANALYSIS_WORKERS processes) around the shared analyzer"""
+    global _pool
+    if _pool is None:
+        from pool import AnalysisPool, default_workers
+        _pool = AnalysisPool(default_workers(), analyzer=_get_analyzer())
+    return _pool
+
+
+def _close_pool():
+    """Shut down the analysis worker processes, if any"""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+def _dumps(content) -> bytes:
+    """JSON response body (orjson if installed)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def _compress(body, encoding, fast=False):
+    """body in a content coding ("br" or "gzip"); fast trades ratio for speed (per-request bodies)"""
+    if encoding == "br":
+        return brotli.compress(body, quality=5 if fast else 11)
+    return gzip.compress(body, 6 if fast else 9, mtime=0)
+
+
+def _body(content):
+    """Serialized response body, precompressed in every offered coding if large enough, and its
+    ETag (a hash of the bytes, the same in every worker)"""
+    body = _dumps(content)
+    encoded = {'identity': body}
+    if len(body) >= COMPRESS_MIN_SIZE:
+        for encoding in ENCODINGS:
+            encoded[encoding] = _compress(body, encoding)
+    return {'etag': '"' + _hash(body) + '"', 'encoded': encoded}
+
+
+def _load_snapshot(scraper, started):
+    """Snapshot of what the store holds (no scraping): aggregates and the last week's articles"""
+    aggregator = _store.load_aggregator(scraper.stock_symbols)
+    rows = aggregator.rows()
+    built_at = _store.last_refresh() or time.time()
+    articles = _store.recent_articles(time.time() - scraper.days_back * 86400)
+    
+    # Rows with company name and sector, and symbols per sector (most mentioned first), for batch queries
+    stocks = {}
+    sectors = {}
+    for row in rows:
+        info = scraper.company_data.get(row['symbol'], {})
+        stocks[row['symbol']] = {**row, 'company': info.get('fr', row['symbol']), 'sector': info.get('sector')}
+        if info.get('sector'):
+            sectors.setdefault(info['sector'].lower(), []).append(row['symbol'])
+    
+    # Bodies of the snapshot-only endpoints, serialized once instead of on every request
+    bodies = {
+        'all': _body({"count": len(rows), "data": rows}),
+        'articles': _body({
+            "count": len(articles),
+            "articles": [
+                {
+                    "title": a['title'],
+                    "source": a['source'],
+                    "mentions": a['mentioned_companies'],
+                    "date": a['date'].isoformat() if hasattr(a['date'], 'isoformat') else str(a['date'])
+                }
+                for a in articles
+            ]
+        }),
+    }
     
-    if _data_cache is not None:
-        return _data_cache
+    return {
+        'rows': rows,
+        'by_symbol': {row['symbol']: row for row in rows},
+        'stocks': stocks,
+        'sectors': sectors,
+        'mentioned': aggregator.mentioned,
+        'articles': articles,
+        'bodies': bodies,
+        # Changes whenever the aggregates or articles do; other ETags are derived from it
+        'version': _hash(bodies['all']['etag'].encode() + bodies['articles']['etag'].encode()),
+        'companies': scraper.stock_symbols,
+        'company_info': scraper.company_data,
+        'timestamp': datetime.fromtimestamp(built_at).isoformat(),
+        'built_at': built_at,
+        'build_seconds': time.monotonic() - started,
+        'data_version': _store.data_version()
+    }
+
+
+def _build_snapshot(max_age=SNAPSHOT_TTL):
+    """Scrape and score new articles into the store (unless any worker did so within the
+    last max_age seconds), then return a snapshot of the store"""
+    global _scraper, _store, _dedup
+    started = time.monotonic()
     
     # Import here to avoid issues on module load
-    from scraper_new import SmartNewsScraper
-    from analyzer import SentimentAnalyzer
+    from scraper_new import FALLBACK_SOURCE, SmartNewsScraper
+    from pipeline import DeepFetchPipeline, deep_fetch_enabled
+    from dedup import DedupIndex
+    from companies import attribution_enabled
+    from store import ArticleStore
     
-    print("Loading scraper and analyzer...")
-    scraper = SmartNewsScraper()
-    analyzer = SentimentAnalyzer()
+    if _scraper is None:
+        print("Loading scraper and analyzer...")
+        _scraper = SmartNewsScraper()
+    scraper = _scraper
+    if _store is None:
+        _store = ArticleStore()
+    
+    last_refresh = _store.last_refresh()
+    if last_refresh is not None and time.time() - last_refresh < max_age:
+        # Fresh enough (a previous run or another worker): serve the stored data
+        return _load_snapshot(scraper, started)
     
     print("Fetching articles...")
     articles = scraper.get_articles_last_week()
+    # Made-up fallback articles (no source answered) are never stored: they would count in
+    # every aggregate and history from then on
+    articles = [article for article in articles if article['source'] != FALLBACK_SOURCE]
     
-    # Build sentiment dict
-    sentiments = {}
-    
-    # Process mentioned companies
-    for article in articles:
-        text = f"{article['title']} {article['content']}"
-        result = analyzer.analyze_sentiment(text)
-        
-        for company in article['mentioned_companies']:
-            if company not in sentiments:
-                sentiments[company] = {'scores': [], 'count': 0}
-            sentiments[company]['scores'].append(result['score'])
-            sentiments[company]['count'] += 1
-    
-    # Add unmentioned as neutral
-    for symbol in scraper.stock_symbols:
-        if symbol not in sentiments:
-            sentiments[symbol] = {'scores': [0.0], 'count': 0}
-    
-    # Cache it
-    _data_cache = {
-        'sentiments': sentiments,
-        'articles': articles,
-        'companies': scraper.stock_symbols,
-        'company_info': scraper.company_data,
-        'timestamp': datetime.now().isoformat()
+    if _dedup is None:
+        _dedup = DedupIndex(homepages=[profile.url for profile in scraper.profiles])
+    else:
+        _dedup.prune()
+    
+    # Score only articles not stored yet, and not seen under another URL or source (each story once)
+    new_articles = _dedup.filter_new(_store.filter_new(articles))
+    # Each company is scored on the sentences that mention it (whole-article score with
+    # BVMT_ATTRIBUTION=0); BVMT_ANALYSIS_WORKERS > 1 scores on a process pool
+    companies = scraper.company_matcher if attribution_enabled() else None
+    pool = _get_pool()
+    if deep_fetch_enabled():
+        # Full article pages are fetched concurrently and stored as they are scored
+        for batch, results in DeepFetchPipeline(scraper, pool, companies=companies).run(new_articles):
+            _store.add(batch, results)
+            _dedup.add(batch)
+    else:
+        texts = [f"{article['title']} {article['content']}" for article in new_articles]
+        results = pool.analyze_batch(texts, explain=False, companies=companies)
+        _store.add(new_articles, results)
+        _dedup.add(new_articles)
+    _store.mark_refresh()
+    
+    return _load_snapshot(scraper, started)
+
+
+def refresh_snapshot(max_age=SNAPSHOT_TTL):
+    """Build a new snapshot and swap it in, scraping unless the stored data is younger than
+    max_age seconds (0: always scrape).
+    
+    Requests revalidate with the SNAPSHOT_TTL default, the background loop with its own
+    interval, and POST /refresh always scrapes.
+    
+    Single flight: a caller arriving while a refresh is running waits for that one and gets
+    its snapshot instead of starting another, if it was built with a max_age no larger than
+    the caller's; otherwise (e.g. POST /refresh during a TTL refresh) the caller builds
+    again once it is done. On failure the last good snapshot stays.
+    """
+    global _snapshot, _snapshot_max_age, _generation
+    generation = _generation
+    with _refresh_lock:
+        if _generation != generation and _snapshot is not None and _snapshot_max_age <= max_age:
+            return _snapshot
+        snapshot = _build_snapshot(max_age)
+        _snapshot, _snapshot_max_age = snapshot, max_age
+        _generation += 1
+        return snapshot
+
+
+def _revalidate():
+    try:
+        refresh_snapshot()
+    except Exception as e:
+        print(f"Background revalidation failed: {e}")
+    finally:
+        _revalidate_lock.release()
+
+
+def _revalidate_async():
+    """Start a background refresh unless one is already pending or running"""
+    if _refresh_lock.locked() or not _revalidate_lock.acquire(blocking=False):
+        return
+    threading.Thread(target=_revalidate, name="bvmt-revalidate", daemon=True).start()
+
+
+def _reload():
+    global _snapshot, _snapshot_max_age, _generation
+    try:
+        _snapshot, _snapshot_max_age = _load_snapshot(_scraper, time.monotonic()), float("inf")
+        _generation += 1
+    except Exception as e:
+        print(f"Reload from store failed: {e}")
+    finally:
+        _refresh_lock.release()
+
+
+def _sync_from_store(snapshot):
+    """Reload the snapshot from the store in the background if another worker wrote to it since
+    (checked at most every STORE_POLL_INTERVAL seconds; never waits for a running refresh).
+    The current snapshot is served until the reload is done."""
+    global _store_checked
+    now = time.monotonic()
+    if now - _store_checked < STORE_POLL_INTERVAL:
+        return
+    _store_checked = now
+    if _store.data_version() == snapshot['data_version'] or not _refresh_lock.acquire(blocking=False):
+        return
+    threading.Thread(target=_reload, name="bvmt-reload", daemon=True).start()
+
+
+def _get_data():
+    """Current snapshot, stale-while-revalidate.
+    
+    Within SNAPSHOT_TTL it is served as is; up to SNAPSHOT_MAX_STALE it is still served while
+    a refresh runs in the background. Only without a snapshot, or past the maximum
+    staleness, does the request wait for a refresh.
+    """
+    snapshot = _snapshot
+    if snapshot is None:
+        return refresh_snapshot()
+    _sync_from_store(snapshot)
+    age = time.time() - snapshot['built_at']
+    if age > SNAPSHOT_MAX_STALE:
+        return refresh_snapshot()
+    if age > SNAPSHOT_TTL:
+        _revalidate_async()
+    return snapshot
+
+
+def _snapshot_headers(data):
+    """Age of the snapshot served (seconds, as the HTTP Age header) and how long it took to build"""
+    return {
+        "Age": str(int(max(0.0, time.time() - data['built_at']))),
+        "X-Snapshot-Build-Seconds": f"{data['build_seconds']:.3f}",
     }
+
+
+def _etag(data, *key):
+    """Strong ETag of a response computed from the snapshot version and key (endpoint, parameters
+    and whatever else the body depends on)"""
+    return '"' + _hash("\0".join((data['version'], *key)).encode("utf-8")) + '"'
+
+
+def _not_modified(request, etag):
+    """Whether the request's If-None-Match already names this ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def _accepted_encoding(request, offered):
+    """Offered content coding with the highest q in the request's Accept-Encoding (the first
+    offered on a tie), or None if it allows none"""
+    accepted = {}
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in offered:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _variant(etag, encoding):
+    """ETag of a body in a content coding (each coding is a representation of its own)"""
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+def _send(request, data, etag, body, compressible=True, status_code=200):
+    """JSON response with the snapshot headers, or 304 Not Modified if If-None-Match has its ETag.
+    
+    body is the serialized body, a function returning it (only called if it is sent), or the
+    {content coding: bytes} of _body(). With compressible, bodies of COMPRESS_MIN_SIZE bytes or
+    more are sent in the best coding the client accepts. etag=None sends no ETag (never 304), as
+    for error responses.
+    """
+    headers = _snapshot_headers(data)
+    encoding = None
+    if compressible:
+        headers["Vary"] = "Accept-Encoding"
+        encoding = _accepted_encoding(request, ENCODINGS)
+    if etag is not None:
+        # Whether the body is compressed depends only on its size, fixed by the ETag
+        for tag in (_variant(etag, encoding), etag):
+            if _not_modified(request, tag):
+                return Response(status_code=304, headers={**headers, "ETag": tag})
     
-    return _data_cache
+    if callable(body):
+        body = body()
+    if isinstance(body, dict):
+        encoded = body
+    else:
+        encoded = {'identity': body}
+        if encoding is not None and len(body) >= COMPRESS_MIN_SIZE:
+            encoded[encoding] = _compress(body, encoding, fast=True)
+    if encoding not in encoded:
+        encoding = None
+    if etag is not None:
+        headers["ETag"] = _variant(etag, encoding)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(encoded[encoding or 'identity'], status_code=status_code, media_type="application/json", headers=headers)
+
+
+def _snapshot_response(request, data, name):
+    """Pre-serialized (and precompressed) body of the snapshot"""
+    body = data['bodies'][name]
+    return _send(request, data, body['etag'], body['encoded'])
+
+
+def _refresh_loop(interval: float):
+    while not _stop_refresh.is_set():
+        try:
+            # Scrapes every `interval` seconds, whatever SNAPSHOT_TTL is; only skipped when
+            # another worker scraped within the interval
+            refresh_snapshot(max_age=interval)
+        except Exception as e:
+            print(f"Background refresh failed: {e}")
+        if _stop_refresh.wait(interval):
+            return
+
+
+def start_background_refresh(interval: float = REFRESH_INTERVAL):
+    """Refresh now and then every `interval` seconds on a daemon thread (no-op if interval <= 0)"""
+    global _refresh_thread
+    if interval <= 0 or (_refresh_thread is not None and _refresh_thread.is_alive()):
+        return
+    _stop_refresh.clear()
+    _refresh_thread = threading.Thread(target=_refresh_loop, args=(interval,), name="bvmt-refresh", daemon=True)
+    _refresh_thread.start()
+
+
+def stop_background_refresh():
+    """Stop scheduling refreshes (a refresh in progress finishes on its own)"""
+    _stop_refresh.set()
 
 
 @app.get("/")
@@ -70,72 +456,125 @@ def root():
     return {"service": "BVMT Sentiment Analysis", "version": "2.0"}
 
 
+@app.get("/sentiment/all")
+def sentiment_all(request: Request):
+    """Get ALL stocks sentiment"""
+    # Rows are kept sorted by mentions (descending) by the aggregator
+    return _snapshot_response(request, _get_data(), 'all')
+
+
+class BatchQuery(BaseModel):
+    """Body of POST /sentiment/batch; omitted filters select everything"""
+    symbols: Optional[List[str]] = None
+    sector: Optional[str] = None
+    fields: Optional[List[str]] = None
+
+
+@app.post("/sentiment/batch")
+def sentiment_batch(request: Request, query: BatchQuery = Body(default_factory=BatchQuery)):
+    """Get sentiment for SEVERAL stocks in one call, filtered by symbols and/or sector (no body: all)"""
+    data = _get_data()
+    
+    # "fields": [] returns the symbols only
+    fields = BATCH_FIELDS if query.fields is None else query.fields
+    bad_fields = [f for f in fields if f not in BATCH_FIELDS]
+    if bad_fields:
+        error = f"Unknown field(s): {', '.join(bad_fields)} (use {', '.join(BATCH_FIELDS)})"
+        return _send(request, data, None, _dumps({"error": error}), False, status_code=400)
+    if "symbol" not in fields:
+        fields = ["symbol", *fields]
+    
+    stocks = data['stocks']
+    unknown = []
+    if query.symbols is None:
+        # Most mentioned first, like /sentiment/all
+        symbols = list(stocks)
+    else:
+        # In request order, each once
+        symbols = []
+        for symbol in dict.fromkeys(s.upper() for s in query.symbols):
+            (symbols if symbol in stocks else unknown).append(symbol)
+    if query.sector is not None:
+        in_sector = set(data['sectors'].get(query.sector.lower(), ()))
+        symbols = [s for s in symbols if s in in_sector]
+    
+    results = [{f: stocks[s][f] for f in fields} for s in symbols]
+    
+    # A POST answer is not cached by clients: no ETag
+    return _send(request, data, None, _dumps({
+        "count": len(results),
+        "data": results,
+        "unknown": unknown
+    }))
+
+
 @app.get("/sentiment/{symbol}")
-def sentiment(symbol: str):
+def sentiment(symbol: str, request: Request):
     """Get sentiment for ONE stock"""
     data = _get_data()
     symbol = symbol.upper()
     
-    if symbol not in data['companies']:
-        return JSONResponse({"error": f"Unknown symbol: {symbol}"}, status_code=404)
-    
-    sent = data['sentiments'].get(symbol, {'scores': [0.0], 'count': 0})
-    scores = sent['scores']
-    avg_score = sum(scores) / len(scores) if scores else 0.0
+    row = data['by_symbol'].get(symbol)
+    if row is None:
+        return _send(request, data, None, _dumps({"error": f"Unknown symbol: {symbol}"}), False, status_code=404)
     
-    return {
-        "symbol": symbol,
-        "score": round(avg_score, 3),
-        "label": "positive" if avg_score > 0.1 else "negative" if avg_score < -0.1 else "neutral",
-        "mentions": sent['count'],
+    return _send(request, data, _etag(data, "sentiment", symbol), lambda: _dumps({
+        **row,
         "company": data['company_info'].get(symbol, {}).get('fr', symbol)
-    }
+    }), compressible=False)
 
 
-@app.get("/sentiment/all")
-def sentiment_all():
-    """Get ALL stocks sentiment"""
+@app.get("/sentiment/{symbol}/history")
+def sentiment_history(
+    request: Request,
+    symbol: str,
+    interval: str = "1d",
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+):
+    """Sentiment time series for ONE stock, from hourly (1h) or daily (1d) rollups"""
+    from store import ROLLUP_INTERVALS
+    
     data = _get_data()
+    symbol = symbol.upper()
+    if symbol not in data['by_symbol']:
+        return _send(request, data, None, _dumps({"error": f"Unknown symbol: {symbol}"}), False, status_code=404)
+    if interval not in ROLLUP_INTERVALS:
+        error = f"Unknown interval: {interval} (use {' or '.join(ROLLUP_INTERVALS)})"
+        return _send(request, data, None, _dumps({"error": error}), False, status_code=400)
+    
+    # Buckets are UTC: a from/to without an offset is UTC too, not the server's local time
+    if end is not None and end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start is not None and start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    # Default range: the last 7 days of hours, or the last 90 days, up to the snapshot's refresh
+    # (the newest data it has), so the response only changes with the snapshot
+    end = end or datetime.fromtimestamp(data['built_at'], timezone.utc)
+    start = start or end - timedelta(days=7 if interval == "1h" else 90)
     
-    results = []
-    for symbol in data['companies']:
-        sent = data['sentiments'].get(symbol, {'scores': [0.0], 'count': 0})
-        scores = sent['scores']
-        avg = sum(scores) / len(scores) if scores else 0.0
-        
-        results.append({
+    # The body is read from the store, which changes between snapshots as articles are scored:
+    # the ETag follows the store's version (read first, so a write meanwhile only costs a 200)
+    etag = _etag(data, "history", str(_store.data_version()), symbol, interval, start.isoformat(), end.isoformat())
+    
+    def body():
+        points = _store.history(symbol, interval, start.timestamp(), end.timestamp())
+        return _dumps({
             "symbol": symbol,
-            "score": round(avg, 3),
-            "label": "positive" if avg > 0.1 else "negative" if avg < -0.1 else "neutral",
-            "mentions": sent['count']
+            "interval": interval,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "count": len(points),
+            "data": points
         })
     
-    # Sort by mentions descending
-    results.sort(key=lambda x: x['mentions'], reverse=True)
-    
-    return {
-        "count": len(results),
-        "data": results
-    }
+    return _send(request, data, etag, body)
 
 
 @app.get("/articles")
-def articles():
+def articles(request: Request):
     """Get all articles with mentions"""
-    data = _get_data()
-    
-    return {
-        "count": len(data['articles']),
-        "articles": [
-            {
-                "title": a['title'],
-                "source": a['source'],
-                "mentions": a['mentioned_companies'],
-                "date": a['date'].isoformat() if hasattr(a['date'], 'isoformat') else str(a['date'])
-            }
-            for a in data['articles']
-        ]
-    }
+    return _snapshot_response(request, _get_data(), 'articles')
 
 
 @app.get("/stats")
@@ -143,21 +582,31 @@ def stats():
     """Get statistics"""
     data = _get_data()
     
-    mentioned_count = sum(1 for s in data['sentiments'].values() if s['count'] > 0)
+    mentioned_count = data['mentioned']
     
-    return {
+    result = {
         "total_companies": len(data['companies']),
         "mentioned": mentioned_count,
         "neutral": len(data['companies']) - mentioned_count,
         "articles": len(data['articles']),
-        "cached_at": data['timestamp']
+        "cached_at": data['timestamp'],
+        "snapshot": {
+            "age_seconds": round(time.time() - data['built_at'], 1),
+            "build_seconds": round(data['build_seconds'], 3),
+            "ttl_seconds": SNAPSHOT_TTL,
+            "max_stale_seconds": SNAPSHOT_MAX_STALE,
+            "refreshing": _refresh_lock.locked()
+        },
+        "analysis_cache": _get_analyzer().cache.stats()
     }
+    
+    # Snapshot age and cache counters change between requests: encoded each time, without an ETag
+    return Response(_dumps(result), media_type="application/json", headers=_snapshot_headers(data))
 
 
 @app.post("/refresh")
-def refresh():
-    """Force refresh cache"""
-    global _data_cache
-    _data_cache = None
-    data = _get_data()
+def refresh(response: Response):
+    """Force a refresh now (joins the one in progress, if any); reads keep the old snapshot meanwhile"""
+    data = refresh_snapshot(max_age=0)
+    response.headers.update(_snapshot_headers(data))
     return {"status": "refreshed", "timestamp": data['timestamp']}
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the sentiment pipeline
+Run: python benchmark.py            (all benchmarks)
+     python benchmark.py <name> ... (selected benchmarks)
+"""
+
+import random
+import re
+import sys
+import io
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from analyzer import SentimentAnalyzer
+from tests.legacy import (
+    SAMPLE_SENTENCES as _SAMPLE_SENTENCES, homepage_fixture as _homepage_fixture, html_fixtures as _html_fixtures,
+    legacy_clean_text as _legacy_clean_text, legacy_extract as _legacy_extract,
+)
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {}
+
+
+def benchmark(fn: Callable[[], None]) -> Callable[[], None]:
+    """Register a benchmark under its function name."""
+    BENCHMARKS[fn.__name__] = fn
+    return fn
+
+
+def _timeit(fn: Callable[[], object], repeat: int = 5) -> float:
+    """Best wall time in seconds over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _report(label: str, seconds: float, items: int) -> None:
+    per_item_us = seconds / items * 1e6 if items else 0.0
+    rate = items / seconds if seconds else float("inf")
+    print(f"  {label:<40} {seconds * 1000:9.1f} ms  {per_item_us:8.1f} us/item  {rate:10.0f} items/s")
+
+
+def sample_texts(n: int, sentences_per_text: int = 2, seed: int = 42) -> List[Tuple[str, Optional[str]]]:
+    """Deterministic (text, stock_symbol) pairs built from FR/AR/EN financial sentences."""
+    rnd = random.Random(seed)
+    symbols = [None, "ATB", "TUNTEL", "BH", "STB"]
+    return [
+        (" ".join(rnd.choice(_SAMPLE_SENTENCES) for _ in range(sentences_per_text)), rnd.choice(symbols))
+        for _ in range(n)
+    ]
+
+
+@benchmark
+def per_article():
+    """Per-article scoring cost on short headlines and analyzer construction cost."""
+    print("\nper_article: analyze_sentiment on 2,000 headline-sized texts")
+    texts = sample_texts(2000)
+    analyzer = SentimentAnalyzer(cache_size=0)
+    seconds = _timeit(lambda: [analyzer.analyze_sentiment(t, s) for t, s in texts])
+    _report("analyze_sentiment", seconds, len(texts))
+    seconds = _timeit(lambda: SentimentAnalyzer(cache_size=0), repeat=20)
+    _report("SentimentAnalyzer() (shared lexicon)", seconds, 1)
+
+
+@benchmark
+def scoring_only():
+    """Throughput with and without explanation building (explain=False is what /sentiment/all needs)."""
+    print("\nscoring_only: 20,000 articles, explain=True vs explain=False")
+    pairs = sample_texts(20000, sentences_per_text=4)
+    texts = [t for t, _ in pairs]
+    symbols = [s for _, s in pairs]
+    analyzer = SentimentAnalyzer(cache_size=0)
+    _report("analyze_sentiment(explain=True)", _timeit(lambda: [analyzer.analyze_sentiment(t, s) for t, s in pairs], 3), len(texts))
+    _report("analyze_sentiment(explain=False)", _timeit(lambda: [analyzer.analyze_sentiment(t, s, explain=False) for t, s in pairs], 3), len(texts))
+    _report("analyze_batch(explain=False)", _timeit(lambda: analyzer.analyze_batch(texts, symbols, explain=False), 3), len(texts))
+
+
+@benchmark
+def cache():
+    """Re-scoring a refresh that repeats the previous one (result cache cold vs warm)."""
+    print("\ncache: 5,000 distinct articles scored twice, as on two consecutive refreshes")
+    rnd = random.Random(1)
+    texts = [f"{t} (réf. {rnd.random():.8f})" for t, _ in sample_texts(5000, sentences_per_text=4)]
+    analyzer = SentimentAnalyzer()
+    start = time.perf_counter()
+    analyzer.analyze_batch(texts, explain=False)
+    _report("first refresh (cold cache)", time.perf_counter() - start, len(texts))
+    start = time.perf_counter()
+    analyzer.analyze_batch(texts, explain=False)
+    _report("second refresh (warm cache)", time.perf_counter() - start, len(texts))
+    print(f"  cache stats: {analyzer.cache.stats()}")
+
+
+@benchmark
+def clean_text():
+    """clean_text vs the former chain of substitutions on long EN/FR/AR documents."""
+    print("\nclean_text: 500 long documents per language (equivalence: tests/test_analyzer.py)")
+    analyzer = SentimentAnalyzer(cache_size=0)
+
+    rnd = random.Random(5)
+    by_language = {
+        "English": [s for s in _SAMPLE_SENTENCES if s.isascii()],
+        "French": [s for s in _SAMPLE_SENTENCES if not s.isascii() and not any("\u0600" <= c <= "\u06ff" for c in s)],
+        "Arabic": [s for s in _SAMPLE_SENTENCES if any("\u0600" <= c <= "\u06ff" for c in s)],
+    }
+    for label, sentences in by_language.items():
+        docs = [" ".join(rnd.choice(sentences) for _ in range(100)) for _ in range(500)]  # ~6-9 KB each
+        _report(f"{label} legacy", _timeit(lambda: [_legacy_clean_text(d) for d in docs]), len(docs))
+        _report(f"{label} clean_text", _timeit(lambda: [analyzer.clean_text(d) for d in docs]), len(docs))
+
+
+@benchmark
+def matching():
+    """Lexicon lookup cost per document: token index build plus one find over its tokens."""
+    from tokens import TokenIndex
+
+    print("\nmatching: TokenIndex + Lexicon.find on 500 long documents per language")
+    lexicon = SentimentAnalyzer(cache_size=0).lexicon
+    rnd = random.Random(7)
+    for label, arabic in (("Latin-script", False), ("Arabic", True)):
+        sentences = [s for s in _SAMPLE_SENTENCES if any("\u0600" <= c <= "\u06ff" for c in s) == arabic]
+        docs = [" ".join(rnd.choice(sentences) for _ in range(100)) for _ in range(500)]
+        _report(f"{label} TokenIndex", _timeit(lambda: [TokenIndex(d) for d in docs]), len(docs))
+        _report(f"{label} TokenIndex + find", _timeit(lambda: [lexicon.find(TokenIndex(d)) for d in docs]), len(docs))
+
+
+def _extraction_peak_kb(method: str) -> int:
+    """Peak RSS growth (KB) while extracting every fixture once; run in a fresh process."""
+    import resource
+
+    from extractor import extract_articles
+
+    extract = extract_articles if method == "lxml" else _legacy_extract
+    pages = _html_fixtures()
+    extract(b"<div class='news'><h2>warm-up</h2></div>")
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for page in pages:
+        extract(page)
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, KB elsewhere
+    return (after - before) // 1024 if sys.platform == "darwin" else after - before
+
+
+@benchmark
+def extraction():
+    """Homepage article extraction: streaming lxml extractor vs BeautifulSoup html.parser."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    from extractor import extract_articles
+
+    pages = _html_fixtures()
+    total_kb = sum(len(p) for p in pages) // 1024
+    print(f"\nextraction: first 5 articles from {len(pages)} pages ({total_kb} KB)")
+    try:
+        import bs4  # noqa: F401
+        methods = ["lxml", "bs4"]
+    except ImportError:
+        print("  (beautifulsoup4 not installed: legacy extraction skipped)")
+        methods = ["lxml"]
+    for method in methods:
+        label = "lxml extract_articles" if method == "lxml" else "BeautifulSoup html.parser"
+        _report(label, _timeit(lambda: [(extract_articles if method == "lxml" else _legacy_extract)(p) for p in pages]), len(pages))
+    if sys.platform != "win32":
+        for method in methods:
+            # Fresh process per method so earlier allocations don't mask the peak
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                peak = executor.submit(_extraction_peak_kb, method).result()
+            print(f"  {method:<40} peak RSS growth {peak:8d} KB")
+
+
+def _legacy_extract_companies(symbols: List[str], company_data: Dict[str, Dict], text: str) -> List[str]:
+    """The former SmartNewsScraper._extract_companies: one regex search per symbol, on lowercased text."""
+    mentioned = []
+    text_lower = text.lower()
+    for symbol in symbols:
+        if re.search(rf'\b{symbol}\b', text_lower):
+            mentioned.append(symbol)
+            continue
+        if symbol in company_data:
+            if company_data[symbol]['fr'].lower() in text_lower or company_data[symbol]['ar'].lower() in text_lower:
+                mentioned.append(symbol)
+    return list(set(mentioned))
+
+
+@benchmark
+def companies():
+    """Company mention extraction over the full symbol universe: CompanyMatcher vs per-symbol loop."""
+    from scraper_new import SmartNewsScraper
+
+    scraper = SmartNewsScraper(cache_dir=None)
+    symbols, company_data = scraper.stock_symbols, scraper.company_data
+    rnd = random.Random(11)
+    names = [data[key] for data in company_data.values() for key in ("fr", "ar")] + symbols
+    docs = []
+    for _ in range(2000):
+        parts = [rnd.choice(_SAMPLE_SENTENCES) for _ in range(8)]
+        for _ in range(3):
+            parts.insert(rnd.randrange(len(parts)), rnd.choice(names))
+        docs.append(" ".join(parts))  # ~1 KB, teaser plus a few paragraphs
+
+    print(f"\ncompanies: mentions of {len(symbols)} symbols in {len(docs)} articles")
+    matcher = scraper.company_matcher
+    legacy_total = sum(len(_legacy_extract_companies(symbols, company_data, d)) for d in docs)
+    matcher_total = sum(len(matcher.mentions(d)) for d in docs)
+    # The loop searched uppercase symbols in lowercased text, so symbols alone were never found
+    print(f"  mentions found: per-symbol loop {legacy_total}, CompanyMatcher {matcher_total}")
+    _report("per-symbol regex loop", _timeit(lambda: [_legacy_extract_companies(symbols, company_data, d) for d in docs], 3), len(docs))
+    _report("CompanyMatcher.find", _timeit(lambda: [matcher.find(d) for d in docs], 3), len(docs))
+
+
+@benchmark
+def attribution():
+    """Per-company scores of multi-company articles: one attributed pass vs one analysis per company."""
+    from scraper_new import SmartNewsScraper
+
+    matcher = SmartNewsScraper(cache_dir=None).company_matcher
+    rnd = random.Random(13)
+    names = ["ATB", "STB", "BIAT", "Tunisie Telecom", "Arab Tunisian Bank", "WIFAK", "ADWYA", "البنك التونسي"]
+    docs = []
+    for _ in range(2000):
+        sentences = [rnd.choice(_SAMPLE_SENTENCES) for _ in range(8)]
+        for i in rnd.sample(range(len(sentences)), 3):
+            sentences[i] = f"{rnd.choice(names)} : {sentences[i]}"
+        docs.append(" ".join(sentences))
+
+    print(f"\nattribution: {len(docs)} articles mentioning ~3 companies each")
+    analyzer = SentimentAnalyzer(cache_size=0)
+
+    def per_company():
+        # Before: find mentions, then score the article once per mentioned company
+        return [[analyzer.analyze_sentiment(d, symbol, explain=False) for symbol in matcher.mentions(d)] for d in docs]
+
+    _report("mentions + analysis per company", _timeit(per_company, 3), len(docs))
+    _report("analyze_batch(companies=matcher)", _timeit(lambda: analyzer.analyze_batch(docs, explain=False, companies=matcher), 3), len(docs))
+    _report("analyze_batch (article score only)", _timeit(lambda: analyzer.analyze_batch(docs, explain=False), 3), len(docs))
+
+
+@benchmark
+def history():
+    """Time-series reads from the store's rollups: 90 days of mentions for every symbol."""
+    import os
+    import tempfile
+    from datetime import datetime, timedelta
+
+    from scraper_new import SmartNewsScraper
+    from store import ArticleStore
+
+    symbols = SmartNewsScraper(cache_dir=None).stock_symbols
+    rnd = random.Random(17)
+    now = datetime.now()
+    articles, results = [], []
+    for i in range(20000):
+        articles.append({
+            "source": "bench", "title": f"article {i}", "url": None,
+            "date": now - timedelta(seconds=rnd.randrange(90 * 86400)),
+            "mentioned_companies": rnd.sample(symbols, 2),
+        })
+        score = round(rnd.uniform(-1, 1), 3)
+        results.append({"score": score, "label": "neutral"})
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = ArticleStore(os.path.join(directory, "bench.sqlite3"))
+        print(f"\nhistory: {len(articles)} articles over 90 days, {len(symbols)} symbols")
+        start = time.perf_counter()
+        for i in range(0, len(articles), 100):
+            store.add(articles[i:i + 100], results[i:i + 100])
+        _report("ArticleStore.add (batches of 100)", time.perf_counter() - start, len(articles))
+        since, until = (now - timedelta(days=90)).timestamp(), now.timestamp()
+        for interval in ("1d", "1h"):
+            points = sum(len(store.history(s, interval, since, until)) for s in symbols)
+            seconds = _timeit(lambda: [store.history(s, interval, since, until) for s in symbols])
+            _report(f"history({interval}) x {len(symbols)} symbols ({points} points)", seconds, len(symbols))
+        store.close()
+
+
+def main(argv: List[str]) -> None:
+    names = argv or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(unknown)}. Available: {', '.join(BENCHMARKS)}")
+        sys.exit(1)
+    for name in names:
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        try:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
+        except (AttributeError, OSError):
+            pass
+    main(sys.argv[1:])
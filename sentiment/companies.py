@@ -0,0 +1,118 @@
+"""
+Company mention extraction
+One prebuilt token table over every symbol and company name, matched in a single pass over
+an article's tokens (whole words only, same tokenization as the analyzer).
+"""
+
+import hashlib
+import os
+from typing import Dict, List, Tuple
+
+from tokens import TokenIndex, tokenize
+
+# (alias tokens, symbol)
+_Alias = Tuple[Tuple[str, ...], str]
+
+
+def attribution_enabled() -> bool:
+    """BVMT_ATTRIBUTION=0 gives every mentioned company the whole-article score."""
+    return os.environ.get("BVMT_ATTRIBUTION", "1") != "0"
+
+
+def _is_all_caps(alias: str) -> bool:
+    return alias == alias.upper() and alias != alias.lower()
+
+
+class CompanyMatcher:
+    """Finds mentions of listed companies by symbol, French name or Arabic name.
+
+    Symbols and all-caps names such as "BIAT" are matched case-sensitively,
+    so "ATLAS" the company is not "Atlas" the mountains; other names are matched
+    case-insensitively. Overlapping names resolve to the longest one; a name shared by
+    several companies mentions all of them.
+    """
+
+    def __init__(self, symbols: List[str], company_data: Dict[str, Dict]):
+        # First token -> aliases starting with it, longest first
+        self._cased: Dict[str, List[_Alias]] = {}
+        self._folded: Dict[str, List[_Alias]] = {}
+        self.symbols = list(symbols)
+        for symbol in self.symbols:
+            data = company_data.get(symbol, {})
+            for alias in (symbol, data.get('fr'), data.get('ar')):
+                if not alias:
+                    continue
+                cased = _is_all_caps(alias) or alias == symbol
+                tokens = tuple(tokenize(alias, keep_case=cased))
+                if not tokens:
+                    continue
+                table = self._cased if cased else self._folded
+                entries = table.setdefault(tokens[0], [])
+                if (tokens, symbol) not in entries:
+                    entries.append((tokens, symbol))
+        for table in (self._cased, self._folded):
+            for entries in table.values():
+                entries.sort(key=lambda entry: -len(entry[0]))
+        # Lowercased first tokens of every alias: where a mention can start
+        self._first_tokens = frozenset(self._folded) | frozenset(key.lower() for key in self._cased)
+        # Changes with the alias tables (part of the analyzer's result cache key)
+        raw = repr((sorted(self._cased.items()), sorted(self._folded.items())))
+        self.version = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:8]
+
+    def _match(self, cased: List[str], lowered: List[str], starts: List[int]) -> Dict[str, List[int]]:
+        """Mentions starting at the given (sorted) candidate positions."""
+        found: Dict[str, List[int]] = {}
+        cased_table, folded_table = self._cased, self._folded
+        covered = 0  # tokens before this index belong to an earlier (longer) mention
+        for i in starts:
+            if i < covered:
+                continue
+            best = 0
+            symbols: List[str] = []
+            for table, tokens in ((cased_table, cased), (folded_table, lowered)):
+                entries = table.get(tokens[i])
+                if not entries:
+                    continue
+                for alias, symbol in entries:
+                    n = len(alias)
+                    if n < best:
+                        break
+                    if n > 1 and tuple(tokens[i:i + n]) != alias:
+                        continue
+                    if n > best:
+                        best, symbols = n, []
+                    if symbol not in symbols:
+                        symbols.append(symbol)
+            if best:
+                # Leftmost-longest: "البنك التونسي العربي" is ATB, not also STB's "البنك التونسي"
+                covered = i + best
+                for symbol in symbols:
+                    found.setdefault(symbol, []).append(i)
+        return found
+
+    def find_tokens(self, tokens: List[str]) -> Dict[str, List[int]]:
+        """Symbol -> token positions of its mentions, in order of first mention.
+
+        tokens are tokenize(text, keep_case=True).
+        """
+        lowered = [token.lower() for token in tokens]
+        first = self._first_tokens
+        return self._match(tokens, lowered, [i for i, token in enumerate(lowered) if token in first])
+
+    def find_index(self, index: TokenIndex) -> Dict[str, List[int]]:
+        """find_tokens for a TokenIndex built with keep_case=True, using its position index
+        instead of scanning every token."""
+        positions, tokens = index.positions, index.tokens
+        starts = sorted(
+            # Plural-stripped entries of the index are not mentions: the token must match as is
+            p for key in self._first_tokens.intersection(positions) for p in positions[key] if tokens[p] == key
+        )
+        return self._match(index.cased, tokens, starts)
+
+    def find(self, text: str) -> Dict[str, List[int]]:
+        """Symbol -> token positions of its mentions in text, in order of first mention."""
+        return self.find_tokens(tokenize(text, keep_case=True))
+
+    def mentions(self, text: str) -> List[str]:
+        """Symbols mentioned in text, in order of first mention."""
+        return list(self.find(text))
@@ -0,0 +1,236 @@
+"""
+Cross-run article deduplication index (SQLite)
+Articles are identified by normalized URL and by a 64-bit SimHash of their text, so the same
+story is scored once even when it is re-scraped or syndicated by another source. Entries
+older than the window are dropped.
+
+Texts too short for a meaningful SimHash are matched by URL only, and two articles of the same
+source with links of their own are never near duplicates: they are templated stories
+("{company} convoque son assemblée générale"), not one story under two URLs.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from tokens import PUNCTUATION, tokenize
+
+DEFAULT_DEDUP_PATH = os.environ.get(
+    "BVMT_DEDUP_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "dedup.sqlite3")
+)
+# Days an article is remembered (ArticleStore keys articles by source and title for as long)
+DEFAULT_WINDOW_DAYS = 7
+# Texts whose SimHashes differ in at most this many bits are the same story
+MAX_DISTANCE = 3
+_BANDS = 4  # MAX_DISTANCE + 1 bands of 16 bits: near duplicates share at least one band
+# Texts with fewer word pairs than this get no SimHash
+MIN_SHINGLES = 8
+# Band value of rows without a SimHash (real bands are 0..0xFFFF, so lookups never reach them)
+_NO_BAND = -1
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "xtor", "at_")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_articles (
+    id INTEGER PRIMARY KEY,
+    url TEXT,
+    simhash INTEGER NOT NULL,
+    band0 INTEGER NOT NULL,
+    band1 INTEGER NOT NULL,
+    band2 INTEGER NOT NULL,
+    band3 INTEGER NOT NULL,
+    seen_at REAL NOT NULL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS seen_articles_url ON seen_articles (url);
+CREATE INDEX IF NOT EXISTS seen_articles_band0 ON seen_articles (band0);
+CREATE INDEX IF NOT EXISTS seen_articles_band1 ON seen_articles (band1);
+CREATE INDEX IF NOT EXISTS seen_articles_band2 ON seen_articles (band2);
+CREATE INDEX IF NOT EXISTS seen_articles_band3 ON seen_articles (band3);
+CREATE INDEX IF NOT EXISTS seen_articles_seen_at ON seen_articles (seen_at);
+"""
+
+
+def normalize_url(url: Optional[str]) -> Optional[str]:
+    """Canonical form of an article URL (None if it is not an http(s) URL).
+
+    Lowercases scheme and host, drops "www.", the fragment, tracking parameters and a
+    trailing slash, and sorts the query.
+    """
+    if not url or not url.lower().startswith(("http://", "https://")):
+        return None
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(_TRACKING_PARAMS)
+    )
+    path = parts.path.rstrip("/")
+    return urlunsplit(("https" if parts.scheme.lower() == "http" else parts.scheme.lower(), host, path, urlencode(query), ""))
+
+
+def simhash(text: str) -> Optional[int]:
+    """64-bit SimHash over word 2-shingles of text (normalized like the analyzer's tokens).
+
+    None if text has fewer than MIN_SHINGLES distinct word pairs: too little text to tell a
+    near duplicate from an unrelated article of the same template.
+    """
+    words = [t for t in tokenize(text) if t not in PUNCTUATION]
+    shingles = set(zip(words, words[1:]))
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    rows = [
+        format(int.from_bytes(hashlib.blake2b(" ".join(s).encode("utf-8"), digest_size=8).digest(), "big"), "064b")
+        for s in shingles
+    ]
+    half = len(rows) / 2
+    # Bit i of the result is set when most shingle hashes have it set
+    bits = "".join("1" if column.count("1") > half else "0" for column in zip(*rows))
+    return int(bits, 2)
+
+
+def _bands(fingerprint: Optional[int]) -> List[int]:
+    if fingerprint is None:
+        return [_NO_BAND] * _BANDS
+    return [(fingerprint >> (16 * i)) & 0xFFFF for i in range(_BANDS)]
+
+
+def _to_signed(value: int) -> int:
+    """SQLite integers are signed 64-bit."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _may_be_same_story(url: Optional[str], source: str, other_url: Optional[str], other_source: Optional[str]) -> bool:
+    """Whether two articles with near-duplicate texts are one story: they are unless both come
+    from the same source with links of their own (templated articles)."""
+    return url is None or other_url is None or source != other_source
+
+
+def _article_text(article: Dict) -> str:
+    return f"{article.get('title', '')} {article.get('content', '')}"
+
+
+class DedupIndex:
+    """Persistent set of recently seen articles with near-duplicate lookup.
+
+    filter_new() drops articles already in the index (same normalized URL, or text within
+    MAX_DISTANCE bits of SimHash) and duplicates within the batch itself; add() records
+    articles once they are scored. Articles whose URL is one of the source homepages (no link
+    of their own) are matched by SimHash only. A SimHash match needs different sources, or an
+    article without a link of its own. Thread-safe.
+    """
+
+    def __init__(self, path: str = DEFAULT_DEDUP_PATH, window_days: float = DEFAULT_WINDOW_DAYS, homepages: Iterable[str] = ()):
+        self.path = path
+        self.window = window_days * 86400
+        self._homepages = {normalize_url(url) for url in homepages} - {None}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(seen_articles)")]
+            if "source" not in columns:  # indexes created before sources were recorded
+                self._conn.execute("ALTER TABLE seen_articles ADD COLUMN source TEXT")
+        self.prune()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def prune(self) -> int:
+        """Drop entries older than the window; returns how many were removed."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM seen_articles WHERE seen_at < ?", (time.time() - self.window,))
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seen_articles").fetchone()[0]
+
+    def _article_url(self, article: Dict) -> Optional[str]:
+        """Normalized URL identifying the article, None if it has no link of its own."""
+        url = normalize_url(article.get('url'))
+        return None if url in self._homepages else url
+
+    def _find(self, url: Optional[str], fingerprint: Optional[int], source: str) -> Optional[int]:
+        """Id of a stored article with this URL or a near-duplicate text (caller holds the lock)."""
+        since = time.time() - self.window
+        if url is not None:
+            row = self._conn.execute(
+                "SELECT id FROM seen_articles WHERE url = ? AND seen_at >= ? LIMIT 1", (url, since)
+            ).fetchone()
+            if row:
+                return row[0]
+        if fingerprint is None:
+            return None
+        bands = _bands(fingerprint)
+        rows = self._conn.execute(
+            "SELECT id, simhash, url, source FROM seen_articles "
+            "WHERE (band0 = ? OR band1 = ? OR band2 = ? OR band3 = ?) AND seen_at >= ?",
+            (*bands, since),
+        ).fetchall()
+        for row_id, stored, stored_url, stored_source in rows:
+            if not _may_be_same_story(url, source, stored_url, stored_source):
+                continue
+            if bin((stored & 0xFFFFFFFFFFFFFFFF) ^ fingerprint).count("1") <= MAX_DISTANCE:
+                return row_id
+        return None
+
+    def filter_new(self, articles: List[Dict]) -> List[Dict]:
+        """Articles not seen before, without duplicates among themselves.
+
+        Each returned article gets a 'fingerprint' (its SimHash), reused by add().
+        """
+        fresh: List[Dict] = []
+        batch_urls = set()
+        # (band number, band) -> (fingerprint, url, source) of the batch's articles so far
+        batch_bands: Dict[Tuple[int, int], List[Tuple[int, Optional[str], str]]] = {}
+        with self._lock:
+            for article in articles:
+                url = self._article_url(article)
+                source = article.get('source', "")
+                fingerprint = simhash(_article_text(article))
+                if url is not None and url in batch_urls:
+                    continue
+                if fingerprint is not None:
+                    candidates = {c for i, band in enumerate(_bands(fingerprint)) for c in batch_bands.get((i, band), ())}
+                    if any(
+                        _may_be_same_story(url, source, other_url, other_source)
+                        and bin(other ^ fingerprint).count("1") <= MAX_DISTANCE
+                        for other, other_url, other_source in candidates
+                    ):
+                        continue
+                if self._find(url, fingerprint, source) is not None:
+                    continue
+                if url is not None:
+                    batch_urls.add(url)
+                if fingerprint is not None:
+                    for i, band in enumerate(_bands(fingerprint)):
+                        batch_bands.setdefault((i, band), []).append((fingerprint, url, source))
+                fresh.append({**article, 'fingerprint': fingerprint})
+        return fresh
+
+    def add(self, articles: List[Dict]) -> None:
+        """Record scored articles."""
+        now = time.time()
+        rows = []
+        for article in articles:
+            if 'fingerprint' in article:
+                fingerprint = article['fingerprint']
+            else:
+                fingerprint = simhash(_article_text(article))
+            rows.append((
+                self._article_url(article), _to_signed(fingerprint or 0), *_bands(fingerprint), now,
+                article.get('source', ""),
+            ))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO seen_articles (url, simhash, band0, band1, band2, band3, seen_at, source) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
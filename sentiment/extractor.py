@@ -0,0 +1,317 @@
+"""
+Article extraction from news homepages (lxml)
+- extract_articles: generic, streaming; feeds the page to lxml's pull parser in chunks, keeps
+  only the subtrees of matching elements and stops once enough articles are complete
+- extract_articles_from_tree: the same on an already parsed page
+- SourceProfile: per-source XPath selectors (sources.json) compiled once, with real dates
+"""
+
+import hashlib
+import json
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from lxml import etree
+
+# Elements considered article containers, as in the former BeautifulSoup selector
+ARTICLE_TAGS = frozenset(("article", "div"))
+ARTICLE_CLASS_RE = re.compile("article|post|news", re.I)
+TITLE_TAGS = ("h1", "h2", "h3", "a")
+_DEFAULT_TITLE = etree.XPath("(.//h1 | .//h2 | .//h3 | .//a)[1]")
+# Article page body when the profile has no article_body: paragraphs of <article>, else all
+_DEFAULT_BODY = etree.XPath("//article//p")
+_ALL_PARAGRAPHS = etree.XPath("//p")
+# Text of these elements is not part of an article's text (BeautifulSoup get_text skips it too)
+_SKIP_TEXT_TAGS = frozenset(("script", "style", "template"))
+
+_CHUNK_SIZE = 16 * 1024
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_\-:.]+)""", re.I)
+
+
+def _detect_encoding(content: bytes) -> str:
+    """Charset declared in the first <meta> tags, default UTF-8."""
+    if content.startswith(b"\xef\xbb\xbf"):
+        return "utf-8"
+    match = _META_CHARSET_RE.search(content[:4096])
+    if match:
+        encoding = match.group(1).decode("ascii").lower()
+        try:
+            "".encode(encoding)
+            return encoding
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def element_text(element, limit: Optional[int] = None, separator: str = "") -> str:
+    """Stripped text pieces of element joined by separator (BeautifulSoup get_text(separator, strip=True)).
+
+    With limit, stops collecting once that many characters are known and returns them.
+    """
+    parts = []
+    size = 0
+
+    def add(text: str) -> bool:
+        nonlocal size
+        text = text.strip()
+        if text:
+            parts.append(text)
+            size += len(text) + len(separator)
+        return limit is not None and size >= limit
+
+    def walk(el) -> bool:
+        if el.tag in _SKIP_TEXT_TAGS:
+            return False
+        if el.text and add(el.text):
+            return True
+        for child in el:
+            # Comments and processing instructions have no text of their own here
+            if isinstance(child.tag, str) and walk(child):
+                return True
+            if child.tail and add(child.tail):
+                return True
+        return False
+
+    walk(element)
+    text = separator.join(parts)
+    return text[:limit] if limit is not None else text
+
+
+def _is_closed(element, container) -> bool:
+    """True if element (inside container, which may still be open) has been fully parsed."""
+    while element is not container:
+        if element.getnext() is not None:
+            return True
+        element = element.getparent()
+    return False
+
+
+def _is_article(element) -> bool:
+    if element.tag not in ARTICLE_TAGS:
+        return False
+    classes = element.get("class")
+    return bool(classes) and ARTICLE_CLASS_RE.search(classes) is not None
+
+
+def extract_articles(content: bytes, limit: int = 5, text_limit: int = 500) -> Tuple[List[Tuple[str, str]], int]:
+    """Return ([(title, text)], elements matched) for the first `limit` article elements.
+
+    Article elements are <article>/<div> whose class matches ARTICLE_CLASS_RE, taken in
+    document order (an element nested in another one counts too). The title is the text of
+    the first h1/h2/h3/a inside; elements without one are skipped. text is cut to text_limit
+    characters.
+    """
+    parser = etree.HTMLPullParser(events=("start", "end"), encoding=_detect_encoding(content))
+    matched = []   # article elements in document order (at most `limit`)
+    done = {}      # id(element) -> (title, text) once known
+    ended = set()  # id(element) of matched elements whose end tag was seen
+    open_matches = 0
+
+    def complete(element) -> bool:
+        """Extract a still-open article once its title and first text_limit chars are parsed."""
+        title_element = next(element.iterdescendants(*TITLE_TAGS), None)
+        if title_element is None or not _is_closed(title_element, element):
+            return False
+        text = element_text(element, text_limit)
+        if len(text) < text_limit:
+            return False
+        done[id(element)] = (element_text(title_element), text)
+        return True
+
+    for offset in [*range(0, len(content), _CHUNK_SIZE), len(content)]:
+        if offset < len(content):
+            parser.feed(content[offset:offset + _CHUNK_SIZE])
+        else:
+            # End of input: elements left open are closed now
+            try:
+                parser.close()
+            except etree.XMLSyntaxError:
+                pass
+        for event, element in parser.read_events():
+            if event == "start":
+                if len(matched) < limit and _is_article(element):
+                    matched.append(element)
+                    open_matches += 1
+                continue
+
+            if open_matches and element in matched:
+                open_matches -= 1
+                ended.add(id(element))
+                if id(element) not in done:
+                    title_element = next(element.iterdescendants(*TITLE_TAGS), None)
+                    if title_element is not None:
+                        done[id(element)] = (element_text(title_element), element_text(element, text_limit))
+            if not open_matches:
+                # Outside any article: drop what was parsed so far
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+        if len(matched) == limit:
+            # Stop once every article is closed or has all we keep of it (e.g. a wrapper
+            # <div class="news-list"> around the whole list)
+            if all(id(e) in ended or id(e) in done or complete(e) for e in matched):
+                break
+
+    articles = [done[id(element)] for element in matched if id(element) in done]
+    return articles, len(matched)
+
+
+def extract_articles_from_tree(root, limit: int = 5, text_limit: int = 500) -> Tuple[List[Tuple[str, str]], int]:
+    """extract_articles on a page that is already parsed (same selection and output)."""
+    matched = []
+    for element in root.iter(*ARTICLE_TAGS):
+        if _is_article(element):
+            matched.append(element)
+            if len(matched) == limit:
+                break
+    articles = []
+    for element in matched:
+        title_element = next(element.iterdescendants(*TITLE_TAGS), None)
+        if title_element is not None:
+            articles.append((element_text(title_element), element_text(element, text_limit)))
+    return articles, len(matched)
+
+
+_MONTHS = {
+    "janvier": 1, "février": 2, "fevrier": 2, "mars": 3, "avril": 4, "mai": 5, "juin": 6,
+    "juillet": 7, "août": 8, "aout": 8, "septembre": 9, "octobre": 10, "novembre": 11,
+    "décembre": 12, "decembre": 12,
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6, "july": 7,
+    "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+}
+# "17 octobre 2026", "17 October 2026 à 10h30", "17/10/2026 10:30"
+_TEXT_DATE_RE = re.compile(r"(\d{1,2})\s+([^\W\d_]+)\.?\s+(\d{4})(?:\D{1,5}(\d{1,2})[:h](\d{2}))?")
+_NUMERIC_DATE_RE = re.compile(r"(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})(?:\D{1,5}(\d{1,2})[:h](\d{2}))?")
+
+
+def parse_date(value: str, date_format: Optional[str] = None) -> Optional[datetime]:
+    """Parse a publication date (ISO 8601, date_format, French/English or dd/mm/yyyy dates).
+
+    Returns a naive local datetime, or None if value is not a recognizable date.
+    """
+    value = value.strip()
+    if not value:
+        return None
+    if date_format:
+        try:
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            pass
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+    except ValueError:
+        pass
+    match = _TEXT_DATE_RE.search(value.lower())
+    if match and match.group(2) in _MONTHS:
+        day, month, year = int(match.group(1)), _MONTHS[match.group(2)], int(match.group(3))
+    else:
+        match = _NUMERIC_DATE_RE.search(value)
+        if not match:
+            return None
+        day, month, year = int(match.group(1)), int(match.group(2)), int(match.group(3))
+    hour, minute = (int(match.group(4)), int(match.group(5))) if match.group(4) else (0, 0)
+    try:
+        return datetime(year, month, day, hour, minute)
+    except ValueError:
+        return None
+
+
+def load_sources(path: str) -> List[Dict]:
+    """Source configurations from a JSON file ({"sources": [{...}, ...]})."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["sources"]
+
+
+class SourceProfile:
+    """Extraction profile of one news source, with its XPath selectors compiled once.
+
+    Configuration keys: name, url, and optionally container (XPath selecting article
+    elements), title, body, date, link (XPaths relative to a container), date_format
+    (strptime format), min_interval, and article_body (XPath of the text on an article's own
+    page). Without a container, or when it matches nothing on a page, the generic
+    extract_articles is used (on the tree already parsed for the container, if any).
+    """
+
+    __slots__ = (
+        "name", "url", "min_interval", "container", "title", "body", "date", "link", "article_body",
+        "date_format", "version",
+    )
+
+    def __init__(self, config: Dict):
+        self.name = config["name"]
+        self.url = config["url"]
+        self.min_interval = config.get("min_interval")
+        self.date_format = config.get("date_format")
+        for key in ("container", "title", "body", "date", "link", "article_body"):
+            # etree.XPathSyntaxError surfaces a bad selector at startup, not mid-scrape
+            setattr(self, key, etree.XPath(config[key]) if config.get(key) else None)
+        if self.title is None:
+            self.title = _DEFAULT_TITLE
+        # Changes when the profile changes, so articles parsed with the old one are not reused
+        self.version = hashlib.sha1(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+
+    @staticmethod
+    def _texts(selector, container, separator: str = "") -> List[str]:
+        """Non-empty texts of what selector returns (elements, attribute values or text nodes)."""
+        texts = []
+        for item in selector(container):
+            text = element_text(item, separator=separator) if isinstance(item, etree._Element) else str(item).strip()
+            if text:
+                texts.append(text)
+        return texts
+
+    def extract(self, content: bytes, limit: int = 5, text_limit: int = 500) -> Tuple[List[Dict], int]:
+        """Return ([{title, text, date, link}], containers matched) for the first `limit` articles.
+
+        date is a datetime or None, link an absolute URL or None. Containers without a title
+        are skipped.
+        """
+        root = None
+        containers = []
+        if self.container is not None and content.strip():
+            root = etree.fromstring(content, etree.HTMLParser(encoding=_detect_encoding(content)))
+            if root is not None:
+                containers = self.container(root)
+        if not containers:
+            if root is not None:
+                # The page is parsed already: no second (streaming) parse
+                extracted, found = extract_articles_from_tree(root, limit, text_limit)
+            else:
+                extracted, found = extract_articles(content, limit, text_limit)
+            return [{"title": title, "text": text, "date": None, "link": None} for title, text in extracted], found
+
+        articles = []
+        for container in containers[:limit]:
+            titles = self._texts(self.title, container)
+            if not titles:
+                continue
+            if self.body is not None:
+                text = " ".join(self._texts(self.body, container))[:text_limit]
+            else:
+                text = element_text(container, text_limit)
+            dates = self._texts(self.date, container) if self.date is not None else []
+            links = self._texts(self.link, container) if self.link is not None else []
+            articles.append({
+                "title": titles[0],
+                "text": text,
+                "date": parse_date(dates[0], self.date_format) if dates else None,
+                "link": urljoin(self.url, links[0]) if links else None,
+            })
+        return articles, len(containers)
+
+    def extract_body(self, content: bytes, text_limit: int = 20000) -> str:
+        """Text of an article page: article_body matches, else the paragraphs of <article>
+        (or of the whole page), joined with spaces and cut to text_limit."""
+        if not content.strip():
+            return ""
+        root = etree.fromstring(content, etree.HTMLParser(encoding=_detect_encoding(content)))
+        if root is None:
+            return ""
+        for selector in ((self.article_body,) if self.article_body is not None else (_DEFAULT_BODY, _ALL_PARAGRAPHS)):
+            texts = self._texts(selector, root, " ")
+            if texts:
+                return " ".join(texts)[:text_limit]
+        return ""
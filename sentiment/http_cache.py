@@ -0,0 +1,145 @@
+"""
+On-disk HTTP cache for the news scraper
+Stores bodies, validators (ETag / Last-Modified) and the scraper's parsed articles per URL,
+revalidates with conditional requests and skips requests made too soon after the last one.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+
+
+def _body_hash(body: bytes) -> str:
+    return hashlib.sha1(body).hexdigest()
+
+
+class CachedFetch:
+    """Outcome of HttpCache.fetch.
+
+    changed is False when the cached body is still current (304 Not Modified, or the minimum
+    refetch interval has not elapsed); parsed then holds what the caller stored for it, if
+    anything.
+    """
+
+    __slots__ = ("content", "changed", "parsed", "status_code")
+
+    def __init__(self, content: bytes, changed: bool, parsed: Any = None, status_code: int = 200):
+        self.content = content
+        self.changed = changed
+        self.parsed = parsed
+        self.status_code = status_code
+
+
+class HttpCache:
+    """Persistent per-URL response cache in `directory` (one .json + one .body file per URL).
+
+    Both files are replaced atomically, and the metadata records the hash of its body: a body
+    without matching metadata (a crash between the two writes) is not used, so a new body is
+    never revalidated with the old validators.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url: str):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".body"
+
+    def _load(self, url: str) -> Optional[Dict]:
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("url") == url else None
+
+    def _write(self, path: str, data: bytes) -> None:
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _save_meta(self, url: str, meta: Dict) -> None:
+        meta_path, _ = self._paths(url)
+        self._write(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    def _read_body(self, url: str, meta: Dict) -> Optional[bytes]:
+        """Cached body of url, None if missing or not the one meta was saved with."""
+        _, body_path = self._paths(url)
+        try:
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except OSError:
+            return None
+        return body if meta.get("body_hash") == _body_hash(body) else None
+
+    def fetch(
+        self,
+        session: requests.Session,
+        url: str,
+        timeout: float,
+        min_interval: float = 0.0,
+        parse_version: str = "",
+    ) -> CachedFetch:
+        """GET url through the cache.
+
+        Within min_interval seconds of the last fetch no request is sent. Otherwise the
+        request carries If-None-Match / If-Modified-Since from the cached response; on 304
+        the cached body is reused. Parsed data stored with another parse_version is not
+        returned. Non-200 responses are returned as-is (changed=True) and not cached.
+        """
+        meta = self._load(url)
+        body = self._read_body(url, meta) if meta else None
+        if meta is None or body is None:
+            meta, body = None, None
+
+        def cached(status_code: int) -> CachedFetch:
+            parsed = meta.get("parsed") if meta.get("parse_version") == parse_version else None
+            return CachedFetch(body, False, parsed, status_code)
+
+        now = time.time()
+        if meta is not None and now - meta.get("fetched_at", 0) < min_interval:
+            return cached(304)
+
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        response = session.get(url, timeout=timeout, headers=headers)
+
+        if response.status_code == 304 and meta is not None:
+            meta["fetched_at"] = now
+            self._save_meta(url, meta)
+            return cached(304)
+        if response.status_code != 200:
+            return CachedFetch(response.content, True, None, response.status_code)
+
+        _, body_path = self._paths(url)
+        self._write(body_path, response.content)
+        self._save_meta(url, {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": now,
+            "body_hash": _body_hash(response.content),
+        })
+        return CachedFetch(response.content, True, None, 200)
+
+    def store_parsed(self, url: str, parsed: Any, parse_version: str = "") -> None:
+        """Attach JSON-serializable parsed data to the cached response of url."""
+        meta = self._load(url)
+        if meta is None:
+            return
+        meta["parsed"] = parsed
+        meta["parse_version"] = parse_version
+        self._save_meta(url, meta)
@@ -6,6 +6,7 @@ import sys
 import io
 
 from analyzer import SentimentAnalyzer
+from pool import AnalysisPool
 from scraper import NewsScraper
 from datetime import datetime
 import json
@@ -34,17 +35,20 @@ class TradingSentimentSystem:
 
         print(f"Found {len(articles)} articles")
         print("Analyzing sentiment...")
+        sentiments = self.analyzer.analyze_batch(
+            [article["content"] for article in articles],
+            [symbol] * len(articles)
+        )
+        return self._summarize_stock(symbol, articles, sentiments)
+
+    def _summarize_stock(self, symbol, articles, sentiments):
+        """Build the per-stock result from its articles and their sentiment results"""
         analyzed_articles = []
         sentiment_scores = []
 
-        for i, article in enumerate(articles, 1):
+        for i, (article, sentiment) in enumerate(zip(articles, sentiments), 1):
             print(f"\n  Article {i}: {article['title'][:50]}...")
 
-            sentiment = self.analyzer.analyze_sentiment(
-                article["content"],
-                symbol
-            )
-
             article_result = {
                 "id": article["id"],
                 "title": article["title"],
@@ -121,18 +125,40 @@ class TradingSentimentSystem:
 
         return result
 
-    def analyze_multiple_stocks(self, stocks, max_articles_per_stock=3):
-        """Analyze sentiment for multiple stocks"""
+    def analyze_multiple_stocks(self, stocks, max_articles_per_stock=3, workers=1):
+        """Analyze sentiment for multiple stocks
+
+        Articles of all stocks are scored together; workers > 1 spreads that scoring over a
+        process pool (None = one worker per CPU core).
+        """
         print(f"\n{'='*60}")
         print("MULTI-STOCK ANALYSIS")
         print(f"{'='*60}")
 
-        results = {}
+        articles_by_stock = {}
+        for stock in stocks:
+            print(f"\nFetching news for {stock}...")
+            articles_by_stock[stock] = self.scraper.get_articles_for_stock(stock, max_articles_per_stock)
 
+        texts = [a["content"] for stock in stocks for a in articles_by_stock[stock]]
+        symbols = [stock for stock in stocks for _ in articles_by_stock[stock]]
+        print(f"\nAnalyzing {len(texts)} articles...")
+        with AnalysisPool(workers, analyzer=self.analyzer) as pool:
+            sentiments = pool.analyze_batch(texts, symbols)
+
+        results = {}
+        offset = 0
         for stock in stocks:
-            print(f"\nAnalyzing {stock}...")
-            result = self.analyze_stock_sentiment(stock, max_articles_per_stock)
-            results[stock] = result
+            articles = articles_by_stock[stock]
+            print(f"\n{'='*60}")
+            print(f"ANALYZING: {stock}")
+            print(f"{'='*60}")
+            if not articles:
+                print(f"No articles found for {stock}")
+                results[stock] = self._create_empty_result(stock)
+                continue
+            results[stock] = self._summarize_stock(stock, articles, sentiments[offset:offset + len(articles)])
+            offset += len(articles)
 
         print(f"\n{'='*60}")
         print("STOCK COMPARISON")
@@ -0,0 +1,191 @@
+"""
+Deep fetch pipeline: follow article links and stream full bodies into scoring
+Stage 1 fetches article pages on a bounded worker pool (per-host rate limit); stage 2 scores
+them in small batches as they arrive. A bounded queue between the stages applies backpressure,
+and everything stops at the deadline: articles not fetched by then are scored from their teaser.
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List, Tuple
+from urllib.parse import urlsplit
+
+from companies import CompanyMatcher
+from extractor import SourceProfile
+
+# Article pages rarely change: don't request one again within this many seconds
+ARTICLE_MIN_INTERVAL = 24 * 3600
+# Bump when body extraction changes so cached bodies are re-extracted
+BODY_PARSE_VERSION = "1"
+
+
+def deep_fetch_enabled() -> bool:
+    """BVMT_DEEP_FETCH=0 turns article-page fetching off (teasers are scored as before)."""
+    return os.environ.get("BVMT_DEEP_FETCH", "1") != "0"
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least 1 / rate seconds apart (thread-safe)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str, deadline_at: float, cancelled: threading.Event) -> bool:
+        """Block until a request to url's host may start; False if that is past the deadline
+        or the pipeline was cancelled meanwhile."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, 0.0))
+            if slot > deadline_at:
+                return False
+            self._next[host] = slot + self.interval
+        return not cancelled.wait(slot - now) if slot > now else not cancelled.is_set()
+
+
+class DeepFetchPipeline:
+    """Fetch the full text of scraped articles and score it as it arrives.
+
+    scraper is a SmartNewsScraper: pages are requested with its fetch() (session, HTTP cache,
+    per-host slots) and read with its source profiles and company matcher; scorer has analyze_batch(texts, symbols, explain, companies),
+    i.e. a SentimentAnalyzer or an AnalysisPool. With companies (a CompanyMatcher), results
+    carry per-company scores and the companies named in the full text are found while scoring.
+    """
+
+    def __init__(
+        self,
+        scraper,
+        scorer,
+        workers: int = 4,
+        per_host_rate: float = 2.0,
+        queue_size: int = 16,
+        batch_size: int = 8,
+        deadline: float = 20.0,
+        body_limit: int = 20000,
+        companies: CompanyMatcher = None,
+    ):
+        """per_host_rate: requests per second per host; queue_size: fetched articles waiting
+        for scoring before fetch workers block; deadline: seconds for the whole run."""
+        self.scraper = scraper
+        self.scorer = scorer
+        self.workers = workers
+        self.rate_limiter = HostRateLimiter(per_host_rate)
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.deadline = deadline
+        self.body_limit = body_limit
+        self.companies = companies
+        self._profiles = {profile.name: profile for profile in scraper.profiles}
+        self._generic_profile = SourceProfile({"name": "", "url": ""})
+
+    def _followable(self, article: Dict) -> bool:
+        url = article.get('url') or ""
+        profile = self._profiles.get(article.get('source'))
+        return url.startswith(("http://", "https://")) and (profile is None or url.rstrip("/") != profile.url.rstrip("/"))
+
+    def _fetch_body(self, url: str, profile, deadline_at: float, cancelled: threading.Event) -> str:
+        """Full text of the article at url ("" if it could not be fetched in time)."""
+        if not self.rate_limiter.wait(url, deadline_at, cancelled) or cancelled.is_set():
+            return ""
+        parse_version = f"{BODY_PARSE_VERSION}:{profile.version}"
+        try:
+            fetched = self.scraper.fetch(url, deadline_at, ARTICLE_MIN_INTERVAL, parse_version)
+        except TimeoutError:
+            return ""
+        if not fetched.changed and fetched.parsed is not None:
+            return fetched.parsed['text']
+        if fetched.status_code not in (200, 304) or not fetched.content:
+            return ""
+        text = profile.extract_body(fetched.content, self.body_limit)
+        self.scraper.store_parsed(url, {'text': text}, parse_version)
+        return text
+
+    def _deepen(self, article: Dict, deadline_at: float, cancelled: threading.Event) -> Dict:
+        """Copy of article with its page's full text as content (unchanged if not fetched)."""
+        if not self._followable(article):
+            return article
+        profile = self._profiles.get(article['source'], self._generic_profile)
+        try:
+            body = self._fetch_body(article['url'], profile, deadline_at, cancelled)
+        except Exception as e:
+            print(f"  Article fetch failed ({article['url'][:60]}): {str(e)[:40]}")
+            return article
+        if len(body) <= len(article['content']):
+            return article
+        if self.companies is not None:
+            # Mentions in the body are found by the scoring pass itself
+            return {**article, 'content': body}
+        # The full text may name more companies than the teaser did
+        mentioned = self.scraper.company_matcher.mentions(f"{article['title']} {body}")
+        companies = article['mentioned_companies'] + [c for c in mentioned if c not in article['mentioned_companies']]
+        return {**article, 'content': body, 'mentioned_companies': companies}
+
+    def _worker(self, work: queue.Queue, fetched: queue.Queue, deadline_at: float, cancelled: threading.Event) -> None:
+        while not cancelled.is_set():
+            try:
+                index, article = work.get_nowait()
+            except queue.Empty:
+                return
+            item = (index, self._deepen(article, deadline_at, cancelled))
+            # Blocks while scoring lags behind (backpressure), but not past cancellation
+            while not cancelled.is_set():
+                try:
+                    fetched.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def _score(self, articles: List[Dict]) -> List[Dict]:
+        texts = [f"{article['title']} {article['content']}" for article in articles]
+        return self.scorer.analyze_batch(texts, [None] * len(texts), explain=False, companies=self.companies)
+
+    def run(self, articles: List[Dict]) -> Iterator[Tuple[List[Dict], List[Dict]]]:
+        """Yield (articles, sentiment results) batches as full texts arrive.
+
+        Every input article is yielded exactly once, in arrival order; those not fetched by
+        the deadline come last, with their teaser as content.
+        """
+        if not articles:
+            return
+        deadline_at = time.monotonic() + self.deadline
+        cancelled = threading.Event()
+        work: queue.Queue = queue.Queue()
+        for item in enumerate(articles):
+            work.put(item)
+        fetched: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        threads = [
+            threading.Thread(target=self._worker, args=(work, fetched, deadline_at, cancelled), daemon=True)
+            for _ in range(max(1, min(self.workers, len(articles))))
+        ]
+        for thread in threads:
+            thread.start()
+
+        pending = set(range(len(articles)))
+        try:
+            while pending:
+                remaining = deadline_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch = [fetched.get(timeout=remaining)]
+                except queue.Empty:
+                    break
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(fetched.get_nowait())
+                    except queue.Empty:
+                        break
+                pending.difference_update(index for index, _ in batch)
+                batch_articles = [article for _, article in batch]
+                yield batch_articles, self._score(batch_articles)
+        finally:
+            cancelled.set()
+
+        if pending:
+            print(f"  Deep fetch deadline: {len(pending)} articles scored from their teaser")
+            late = [articles[index] for index in sorted(pending)]
+            yield late, self._score(late)
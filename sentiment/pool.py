@@ -0,0 +1,145 @@
+"""
+Process-pool execution mode for SentimentAnalyzer
+Spreads large article backfills over several worker processes (one CPU core each).
+"""
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from analyzer import SentimentAnalyzer
+from companies import CompanyMatcher
+
+# Per-process analyzer, created once by _init_worker
+_worker_analyzer: Optional[SentimentAnalyzer] = None
+
+
+def _init_worker(analyzer: SentimentAnalyzer) -> None:
+    """Keep the analyzer sent by the parent; its lexicon is compiled once on unpickling."""
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+
+def _analyze_chunk(chunk: Tuple[List[str], List[Optional[str]], bool, Optional[CompanyMatcher]]) -> List[Dict]:
+    texts, stock_symbols, explain, companies = chunk
+    return _worker_analyzer.analyze_batch(texts, stock_symbols, explain, companies)
+
+
+def default_workers() -> int:
+    """Worker count from BVMT_ANALYSIS_WORKERS (0 = one per CPU core), default 1 (in-process)."""
+    workers = int(os.environ.get("BVMT_ANALYSIS_WORKERS", "1"))
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+class AnalysisPool:
+    """Score texts with SentimentAnalyzer.analyze_batch across worker processes.
+
+    Texts are sent in chunks so pickling/IPC cost is paid per chunk, not per article, and
+    results come back in input order. Results cached by the parent analyzer are not resent.
+    With one worker (or a batch of one chunk) everything runs in the calling process.
+
+    Workers start on the first parallel batch and are kept for the next ones (starting a
+    process costs an interpreter and the imports); they are restarted when the analyzer's
+    lexicon changes. close() them when done, or use the pool as a context manager.
+    """
+
+    def __init__(self, workers: Optional[int] = None, analyzer: SentimentAnalyzer = None, chunk_size: int = None):
+        """workers=None uses one process per CPU core; chunk_size=None picks ~4 chunks per worker."""
+        self.workers = workers if workers else (os.cpu_count() or 1)
+        self.analyzer = analyzer or SentimentAnalyzer()
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Lexicon version of the analyzer copy the workers were started with
+        self._lexicon_version: Optional[str] = None
+
+    def __enter__(self) -> "AnalysisPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down worker processes (they are started on first parallel batch)."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _chunk_size_for(self, n: int) -> int:
+        if self.chunk_size:
+            return self.chunk_size
+        return max(1, min(1000, math.ceil(n / (self.workers * 4))))
+
+    def analyze_batch(
+        self,
+        texts: List[str],
+        stock_symbols: Optional[List[Optional[str]]] = None,
+        explain: bool = True,
+        companies: CompanyMatcher = None,
+    ) -> List[Dict]:
+        """Same contract as SentimentAnalyzer.analyze_batch, computed across the pool."""
+        if stock_symbols is None:
+            stock_symbols = [None] * len(texts)
+        elif len(stock_symbols) != len(texts):
+            raise ValueError("stock_symbols must have one entry per text")
+
+        size = self._chunk_size_for(len(texts))
+        if self.workers <= 1 or len(texts) <= size:
+            return self.analyzer.analyze_batch(texts, stock_symbols, explain, companies)
+
+        # Cached results come from this process's analyzer; only misses go to the workers
+        return self.analyzer.analyze_batch(
+            texts, stock_symbols, explain, companies,
+            score_misses=lambda misses, symbols: self._map(misses, symbols, explain, companies),
+        )
+
+    def _map(
+        self, texts: List[str], stock_symbols: List[Optional[str]], explain: bool, companies: Optional[CompanyMatcher]
+    ) -> List[Dict]:
+        """Score texts on the worker processes (started, or restarted for a new lexicon, here)."""
+        if self._executor is not None and self._lexicon_version != self.analyzer.lexicon.version:
+            self.close()
+        if self._executor is None:
+            # spawn, not fork: the API calls this from a process with running threads and
+            # locks (refresh loop, caches), which a forked child could inherit mid-use
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.analyzer,),
+            )
+            self._lexicon_version = self.analyzer.lexicon.version
+        size = self._chunk_size_for(len(texts))
+        chunks = [
+            (texts[i:i + size], stock_symbols[i:i + size], explain, companies)
+            for i in range(0, len(texts), size)
+        ]
+        results: List[Dict] = []
+        for chunk_results in self._executor.map(_analyze_chunk, chunks):
+            results.extend(chunk_results)
+        return results
+        pending_texts = [texts[d] for d, _, _ in pending]
+        pending_symbols = [stock_symbols[d] for d, _, _ in pending]
+        size = self._chunk_size_for(len(pending))
+
+        if self._executor is None:
+            # spawn, not fork: the API calls this from a process with running threads and
+            # locks (refresh loop, caches), which a forked child could inherit mid-use
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.analyzer,),
+            )
+        chunks = [
+            (pending_texts[i:i + size], pending_symbols[i:i + size], explain, companies)
+            for i in range(0, len(pending_texts), size)
+        ]
+        computed: List[Dict] = []
+        for chunk_results in self._executor.map(_analyze_chunk, chunks):
+            computed.extend(chunk_results)
+        for (d, _, _), result in zip(pending, computed):
+            results[d] = result
+        self.analyzer._store_batch(pending, results)
+        return results
@@ -7,11 +7,19 @@ Smart News Scraper for Tunisian Stock Market
 
 import sys
 import io
+import os
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
-from bs4 import BeautifulSoup
-import re
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+
+from companies import CompanyMatcher
+from extractor import SourceProfile, load_sources
+from http_cache import CachedFetch, HttpCache
 
 def _windows_utf8_stdout():
     if sys.platform == "win32":
@@ -23,12 +31,44 @@ def _windows_utf8_stdout():
 
 _windows_utf8_stdout()
 
+# News sources and their extraction profiles: only focus on getting real content
+DEFAULT_SOURCES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sources.json")
+
+# Responses (and the articles parsed from them) are kept here between runs
+DEFAULT_CACHE_DIR = os.environ.get(
+    "BVMT_HTTP_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".http_cache")
+)
+# Bump when parsing changes so cached parsed articles are rebuilt from the cached bodies
+PARSE_VERSION = "3"
+# Source of the made-up articles returned when no live source answered
+FALLBACK_SOURCE = "Fallback"
+
 
 class SmartNewsScraper:
     """Smart scraper that only analyzes mentioned companies"""
     
-    def __init__(self):
-        """Initialize scraper with stock symbols and source configuration"""
+    def __init__(
+        self,
+        sources: Optional[List[Dict]] = None,
+        sources_file: str = DEFAULT_SOURCES_FILE,
+        timeout: float = 5,
+        deadline: float = 10,
+        max_workers: int = 8,
+        max_per_host: int = 2,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        min_refetch_interval: float = 0,
+    ):
+        """Initialize scraper with stock symbols and source configuration
+
+        sources: source configurations to scrape ({"name", "url"} plus optional extraction
+            profile, see extractor.SourceProfile); default: the "sources" of sources_file
+        timeout: per-request timeout in seconds
+        deadline: overall time budget of one scrape; slower sources are dropped
+        max_workers / max_per_host: concurrent requests overall / per host
+        cache_dir: on-disk HTTP cache (conditional requests, no re-parse on 304); None disables it
+        min_refetch_interval: seconds before a source is requested again (a source's own
+            "min_interval" overrides it); until then its cached articles are reused
+        """
         self.stock_symbols = [
             # Bancaire (Banking) - 21 stocks
             "ATB", "STB", "BH", "AB", "UIB", "BT", "BFPAAS", "ATTIJARI", "BKPORT", "BNAFFES",
@@ -160,19 +200,29 @@ class SmartNewsScraper:
             # Add symbol itself
             self.company_lookup[symbol.lower()] = symbol
         
-        # News sources: only focus on getting real content
-        self.sources = [
-            {"name": "Kapitalis", "url": "https://www.kapitalis.com"},
-            {"name": "IlBoursa", "url": "https://www.ilboursa.com"},
-            {"name": "La Presse", "url": "https://www.lapresse.tn"},
-            {"name": "Le Temps", "url": "https://www.letemps.com.tn"},
-            {"name": "Business News", "url": "https://www.businessnews.com.tn"},
-        ]
+        # All symbols and names in one table, matched in a single pass per article
+        self.company_matcher = CompanyMatcher(self.stock_symbols, self.company_data)
+        
+        self.sources = list(sources) if sources is not None else load_sources(sources_file)
+        # Selectors are compiled once here, not per page
+        self.profiles = [SourceProfile(source) for source in self.sources]
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
         
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        # Keep up to max_per_host pooled connections per host
+        adapter = HTTPAdapter(pool_connections=max(len(self.sources), 1), pool_maxsize=max_per_host)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._host_slots: Dict[str, threading.Semaphore] = {}
+        self._host_slots_lock = threading.Lock()
+        self.http_cache = HttpCache(cache_dir) if cache_dir else None
+        self.min_refetch_interval = min_refetch_interval
         
         # Time filter: only articles from last 7 days
         self.days_back = 7
@@ -201,72 +251,127 @@ class SmartNewsScraper:
         return articles
     
     def _scrape_from_sources(self, since: datetime) -> List[Dict]:
-        """Try to scrape from configured sources"""
-        articles = []
+        """Try to scrape from configured sources
+
+        All sources are fetched concurrently (at most max_per_host requests per host). Sources
+        that have not answered when the deadline expires are skipped: the articles of the
+        sources that did answer are returned.
+        """
+        if not self.sources:
+            return []
+        
+        deadline_at = time.monotonic() + self.deadline
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.sources)))
+        futures = {
+            executor.submit(self._fetch_source, profile, deadline_at): profile
+            for profile in self.profiles
+        }
+        done, not_done = wait(futures, timeout=self.deadline)
+        # Don't wait for slow hosts: their requests end on their own timeout
+        executor.shutdown(wait=False, cancel_futures=True)
         
-        for source in self.sources:
+        articles = []
+        for future, profile in futures.items():
+            if future not in done:
+                print(f"  {profile.name}: ✗ Deadline exceeded")
+                continue
             try:
-                print(f"  Trying {source['name']}...", end=" ")
-                response = self.session.get(source['url'], timeout=5)
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # Find article elements (adapt selectors based on site structure)
-                    article_elements = soup.find_all(['article', 'div'], class_=re.compile('article|post|news', re.I))
-                    
-                    for elem in article_elements[:5]:  # Limit to 5 per source
-                        title_elem = elem.find(['h1', 'h2', 'h3', 'a'])
-                        if title_elem:
-                            title = title_elem.get_text(strip=True)
-                            content = elem.get_text(strip=True)[:500]  # First 500 chars
-                            
-                            article = {
-                                'title': title,
-                                'content': content,
-                                'source': source['name'],
-                                'url': source['url'],
-                                'date': datetime.now(),
-                                'mentioned_companies': self._extract_companies(f"{title} {content}")
-                            }
-                            
-                            # Only add if mentions a company
-                            if article['mentioned_companies']:
-                                articles.append(article)
-                    
-                    if article_elements:
-                        print(f"✓ Found {len(article_elements)} articles")
-                    else:
-                        print("✗ No articles found")
-                else:
-                    print(f"✗ Status {response.status_code}")
-                    
+                source_articles, found = future.result()
             except Exception as e:
-                print(f"✗ Error: {str(e)[:40]}")
+                print(f"  {profile.name}: ✗ Error: {str(e)[:40]}")
+                continue
+            if found:
+                print(f"  {profile.name}: ✓ Found {found} articles")
+            else:
+                print(f"  {profile.name}: ✗ No articles found")
+            # Articles published before `since` are dropped (undated ones are dated now)
+            articles.extend(a for a in source_articles if since is None or a['date'] >= since)
         
+        if not_done:
+            print(f"  Partial results: {len(not_done)} of {len(self.sources)} sources timed out")
         return articles
     
-    def _extract_companies(self, text: str) -> List[str]:
-        """Extract company symbols mentioned in text"""
-        mentioned = []
-        text_lower = text.lower()
+    def _host_slot(self, url: str) -> threading.Semaphore:
+        """Semaphore limiting concurrent requests to the host of url"""
+        host = urlsplit(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.Semaphore(self.max_per_host)
+        return slot
+    
+    def fetch(self, url: str, deadline_at: float, min_interval: float = 0.0, parse_version: str = "") -> CachedFetch:
+        """GET url on the scraper's session, through its HTTP cache if it has one
+        (min_interval and parse_version as for HttpCache.fetch).
         
-        # Check for each company symbol and name
-        for symbol in self.stock_symbols:
-            # Check for symbol
-            if re.search(rf'\b{symbol}\b', text_lower):
-                mentioned.append(symbol)
-                continue
+        Holds one of the host's max_per_host slots while the request runs and never waits past
+        deadline_at (time.monotonic()): raises TimeoutError if it has passed once a slot is free.
+        """
+        with self._host_slot(url):
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("deadline exceeded")
+            timeout = min(self.timeout, remaining)
+            if self.http_cache is not None:
+                return self.http_cache.fetch(self.session, url, timeout, min_interval, parse_version)
+            response = self.session.get(url, timeout=timeout)
+            return CachedFetch(response.content, True, None, response.status_code)
+    
+    def store_parsed(self, url: str, parsed: Dict, parse_version: str = "") -> None:
+        """Keep what was parsed from url's page, returned by fetch() while the page is unchanged"""
+        if self.http_cache is not None:
+            self.http_cache.store_parsed(url, parsed, parse_version)
+    
+    def _fetch_source(self, profile: SourceProfile, deadline_at: float) -> Tuple[List[Dict], int]:
+        """Fetch and parse one source; returns (articles mentioning a company, elements found)"""
+        url = profile.url
+        parse_version = f"{PARSE_VERSION}:{profile.version}"
+        min_interval = profile.min_interval if profile.min_interval is not None else self.min_refetch_interval
+        fetched = self.fetch(url, deadline_at, min_interval, parse_version)
+        content = fetched.content
+        
+        if not fetched.changed:
+            # Unchanged page: reuse the articles parsed last time
+            if fetched.parsed is not None:
+                return [self._article_from_json(a) for a in fetched.parsed['articles']], fetched.parsed['found']
+        elif fetched.status_code != 200:
+            raise requests.HTTPError(f"Status {fetched.status_code}")
+        
+        articles = []
+        # Article elements (selectors from the source's profile in sources.json); keep the
+        # first 5 per source and the first 500 chars of each
+        extracted, found = profile.extract(content, limit=5, text_limit=500)
+        
+        for item in extracted:
+            article = {
+                'title': item['title'],
+                'content': item['text'],
+                'source': profile.name,
+                'url': item['link'] or profile.url,
+                'date': item['date'] or datetime.now(),
+                'mentioned_companies': self._extract_companies(f"{item['title']} {item['text']}")
+            }
             
-            # Check for company names in lookup
-            if symbol in self.company_data:
-                fr_name = self.company_data[symbol]['fr'].lower()
-                ar_name = self.company_data[symbol]['ar'].lower()
-                
-                if fr_name in text_lower or ar_name in text_lower:
-                    mentioned.append(symbol)
+            # Only add if mentions a company
+            if article['mentioned_companies']:
+                articles.append(article)
         
-        return list(set(mentioned))  # Remove duplicates
+        if self.http_cache is not None:
+            parsed = {'articles': [self._article_to_json(a) for a in articles], 'found': found}
+            self.store_parsed(url, parsed, parse_version)
+        return articles, found
+    
+    @staticmethod
+    def _article_to_json(article: Dict) -> Dict:
+        return {**article, 'date': article['date'].isoformat()}
+    
+    @staticmethod
+    def _article_from_json(data: Dict) -> Dict:
+        return {**data, 'date': datetime.fromisoformat(data['date'])}
+    
+    def _extract_companies(self, text: str) -> List[str]:
+        """Extract company symbols mentioned in text (in order of first mention)"""
+        return self.company_matcher.mentions(text)
     
     def _get_fallback_articles(self) -> List[Dict]:
         """Provide realistic fallback articles when no live sources available"""
@@ -274,7 +379,7 @@ class SmartNewsScraper:
             {
                 'title': 'Banking Sector Reports Strong Q4 Results',
                 'content': 'ATB and STB lead with positive earnings. Arab Tunisian Bank shows 15% growth. Banking sector remains stable.',
-                'source': 'Fallback',
+                'source': FALLBACK_SOURCE,
                 'url': 'N/A',
                 'date': datetime.now() - timedelta(days=1),
                 'mentioned_companies': ['ATB', 'STB']
@@ -282,7 +387,7 @@ class SmartNewsScraper:
             {
                 'title': 'Telecommunications Growth Continues',
                 'content': 'TUNTEL reports increased customer base. Sector expansion drives market forward.',
-                'source': 'Fallback',
+                'source': FALLBACK_SOURCE,
                 'url': 'N/A',
                 'date': datetime.now() - timedelta(days=2),
                 'mentioned_companies': ['TUNTEL']
@@ -290,7 +395,7 @@ class SmartNewsScraper:
             {
                 'title': 'Insurance Companies Navigate Market Changes',
                 'content': 'WIFAK and ADWYA adjust strategies. Assurance sector faces headwinds but shows resilience.',
-                'source': 'Fallback',
+                'source': FALLBACK_SOURCE,
                 'url': 'N/A',
                 'date': datetime.now() - timedelta(days=3),
                 'mentioned_companies': ['WIFAK', 'ADWYA']
@@ -298,7 +403,7 @@ class SmartNewsScraper:
             {
                 'title': 'Industrial Manufacturing Gains Momentum',
                 'content': 'TALTEX production increases. Manufacturing sector shows positive indicators.',
-                'source': 'Fallback',
+                'source': FALLBACK_SOURCE,
                 'url': 'N/A',
                 'date': datetime.now() - timedelta(days=4),
                 'mentioned_companies': ['TALTEX']
@@ -306,7 +411,7 @@ class SmartNewsScraper:
             {
                 'title': 'Food Sector Sees Export Opportunities',
                 'content': 'KAROUI and MOUNA expand international presence. Agroalimentaire sector benefits from global demand.',
-                'source': 'Fallback',
+                'source': FALLBACK_SOURCE,
                 'url': 'N/A',
                 'date': datetime.now() - timedelta(days=5),
                 'mentioned_companies': ['KAROUI', 'MOUNA']
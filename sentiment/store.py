@@ -0,0 +1,341 @@
+"""
+Persistent article and score store (SQLite, WAL mode)
+Articles, their company mentions and per-symbol aggregate state live in one database file
+shared by every API worker process; a worker starts from it instead of re-scoring the week.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from aggregator import (
+    DEFAULT_HALF_LIFE_HOURS, SentimentAggregator, SymbolStats, article_key, article_time, company_scores,
+    sentiment_label,
+)
+from dedup import DEFAULT_WINDOW_DAYS
+
+DEFAULT_STORE_PATH = os.environ.get(
+    "BVMT_STORE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "sentiment.sqlite3")
+)
+
+_ARTICLES_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT,
+    date REAL NOT NULL,
+    companies TEXT NOT NULL,
+    score REAL NOT NULL,
+    label TEXT NOT NULL,
+    scored_at REAL NOT NULL
+)"""
+
+_SCHEMA = _ARTICLES_TABLE.format(table="articles") + """;
+CREATE INDEX IF NOT EXISTS articles_source_title ON articles (source, title, date);
+CREATE INDEX IF NOT EXISTS articles_source_url ON articles (source, url);
+CREATE INDEX IF NOT EXISTS articles_date ON articles (date);
+CREATE TABLE IF NOT EXISTS mentions (
+    article_id INTEGER NOT NULL REFERENCES articles (id),
+    symbol TEXT NOT NULL,
+    date REAL NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (article_id, symbol)
+);
+CREATE INDEX IF NOT EXISTS mentions_symbol_date ON mentions (symbol, date);
+CREATE TABLE IF NOT EXISTS symbol_stats (
+    symbol TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    decayed_sum REAL NOT NULL,
+    decayed_weight REAL NOT NULL,
+    anchor REAL
+);
+CREATE TABLE IF NOT EXISTS rollups (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    bucket REAL NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    decayed_sum REAL NOT NULL,
+    decayed_weight REAL NOT NULL,
+    anchor REAL,
+    PRIMARY KEY (symbol, interval, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_STATS_COLUMNS = ("count", "total", "min", "max", "decayed_sum", "decayed_weight", "anchor")
+# Rollup bucket sizes in seconds; buckets start on UTC hour / day boundaries
+ROLLUP_INTERVALS = {"1h": 3600, "1d": 86400}
+
+
+def _stats_from_row(row: tuple) -> SymbolStats:
+    stats = SymbolStats()
+    for column, value in zip(_STATS_COLUMNS, row):
+        setattr(stats, column, value)
+    return stats
+
+
+class ArticleStore:
+    """Scored articles, mentions and per-symbol aggregates in a SQLite database.
+
+    add() stores a batch and folds it into symbol_stats in one transaction, so concurrent
+    writers (several uvicorn workers) never double-count an article or lose an update.
+    load_aggregator() rebuilds a SentimentAggregator from symbol_stats without rescanning
+    articles, and history() reads the hourly / daily rollups kept alongside. data_version() changes with every commit. Thread-safe.
+
+    An article is already stored when one with the same source and title was published within
+    window_days of it (as in DedupIndex), so a recurring headline ("Bulletin de la cote") is
+    stored again once the window has passed.
+    """
+
+    def __init__(
+        self, path: str = DEFAULT_STORE_PATH, half_life_hours: float = DEFAULT_HALF_LIFE_HOURS,
+        window_days: float = DEFAULT_WINDOW_DAYS,
+    ):
+        self.path = path
+        self.window = window_days * 86400
+        self.half_life_hours = half_life_hours
+        self.decay_rate = math.log(2) / (half_life_hours * 3600.0)
+        self._lock = threading.Lock()
+        # Batches committed by add() on this connection (PRAGMA data_version only sees other ones)
+        self._writes = 0
+        # Transactions are explicit (BEGIN IMMEDIATE in add)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._drop_title_unique()
+        self._conn.executescript(_SCHEMA)
+        self._backfill_rollups()
+
+    def _drop_title_unique(self) -> None:
+        """Rebuild the articles table of databases created when (source, title) was unique forever."""
+        conn = self._conn
+        query = "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_autoindex_articles_1'"
+        if not conn.execute(query).fetchone():
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute(query).fetchone():  # not rebuilt meanwhile by another worker
+                conn.execute(_ARTICLES_TABLE.format(table="articles_rebuilt"))
+                conn.execute("INSERT INTO articles_rebuilt SELECT * FROM articles")
+                conn.execute("DROP TABLE articles")
+                conn.execute("ALTER TABLE articles_rebuilt RENAME TO articles")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def data_version(self) -> Tuple[int, int]:
+        """Changes whenever articles are added, by this store or another connection (e.g. another worker)."""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0], self._writes
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def last_refresh(self) -> Optional[float]:
+        """POSIX time of the last completed scrape recorded by any worker."""
+        with self._lock:
+            value = self._get_meta("refreshed_at")
+        return float(value) if value is not None else None
+
+    def mark_refresh(self, when: float = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('refreshed_at', ?)",
+                (str(when if when is not None else time.time()),),
+            )
+
+    def filter_new(self, articles: List[Dict]) -> List[Dict]:
+        """Articles not stored yet (by source and title, within the window of their date)."""
+        if not articles:
+            return []
+        keys = {article_key(article) for article in articles}
+        with self._lock:
+            stored: Dict[Tuple[str, str], List[float]] = {}
+            for source in {source for source, _ in keys}:
+                titles = [title for s, title in keys if s == source]
+                for i in range(0, len(titles), 500):
+                    chunk = titles[i:i + 500]
+                    rows = self._conn.execute(
+                        f"SELECT title, date FROM articles WHERE source = ? AND title IN ({','.join('?' * len(chunk))})",
+                        (source, *chunk),
+                    ).fetchall()
+                    for title, date in rows:
+                        stored.setdefault((source, title), []).append(date)
+        fresh = []
+        for article in articles:
+            when = article_time(article)
+            if not any(abs(when - date) < self.window for date in stored.get(article_key(article), ())):
+                fresh.append(article)
+        return fresh
+
+    def add(self, articles: List[Dict], results: List[Dict]) -> int:
+        """Store scored articles and add them to symbol_stats and rollups; returns how many were new."""
+        now = time.time()
+        added = 0
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                stats: Dict[str, SymbolStats] = {}
+                buckets: Dict[Tuple[str, str, float], SymbolStats] = {}
+                for article, result in zip(articles, results):
+                    when = article_time(article)
+                    source, title = article_key(article)
+                    if conn.execute(
+                        "SELECT 1 FROM articles WHERE source = ? AND title = ? AND date > ? AND date < ? LIMIT 1",
+                        (source, title, when - self.window, when + self.window),
+                    ).fetchone():
+                        continue  # stored meanwhile (e.g. by another worker) or earlier in this batch
+                    scores = company_scores(article, result)
+                    cursor = conn.execute(
+                        "INSERT INTO articles (source, title, url, date, companies, score, label, scored_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            source, title, article.get("url"), when,
+                            json.dumps([company for company, _ in scores]), result["score"], result["label"], now,
+                        ),
+                    )
+                    added += 1
+                    article_id = cursor.lastrowid
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO mentions (article_id, symbol, date, score) VALUES (?, ?, ?, ?)",
+                        [(article_id, company, when, score) for company, score in scores],
+                    )
+                    for company, score in scores:
+                        if company not in stats:
+                            row = conn.execute(
+                                f"SELECT {', '.join(_STATS_COLUMNS)} FROM symbol_stats WHERE symbol = ?", (company,)
+                            ).fetchone()
+                            stats[company] = _stats_from_row(row) if row else SymbolStats()
+                        stats[company].add(score, when, self.decay_rate)
+                    self._add_to_rollups(buckets, scores, when)
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO symbol_stats (symbol, {', '.join(_STATS_COLUMNS)}) "
+                    f"VALUES (?, {', '.join('?' * len(_STATS_COLUMNS))})",
+                    [(symbol, *(getattr(s, column) for column in _STATS_COLUMNS)) for symbol, s in stats.items()],
+                )
+                self._save_rollups(buckets)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            if added:
+                self._writes += 1
+        return added
+
+    def _add_to_rollups(
+        self, buckets: Dict[Tuple[str, str, float], SymbolStats], scores: List[Tuple[str, float]], when: float
+    ) -> None:
+        """Add one article's (company, score) pairs to its hour and day buckets (lock held)."""
+        for interval, size in ROLLUP_INTERVALS.items():
+            bucket = when - when % size
+            for company, score in scores:
+                key = (company, interval, bucket)
+                if key not in buckets:
+                    row = self._conn.execute(
+                        f"SELECT {', '.join(_STATS_COLUMNS)} FROM rollups WHERE symbol = ? AND interval = ? AND bucket = ?",
+                        key,
+                    ).fetchone()
+                    buckets[key] = _stats_from_row(row) if row else SymbolStats()
+                buckets[key].add(score, when, self.decay_rate)
+
+    def _save_rollups(self, buckets: Dict[Tuple[str, str, float], SymbolStats]) -> None:
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO rollups (symbol, interval, bucket, {', '.join(_STATS_COLUMNS)}) "
+            f"VALUES (?, ?, ?, {', '.join('?' * len(_STATS_COLUMNS))})",
+            [(*key, *(getattr(s, column) for column in _STATS_COLUMNS)) for key, s in buckets.items()],
+        )
+
+    def _backfill_rollups(self) -> None:
+        """Build rollups from stored mentions once (databases created before rollups existed)."""
+        conn = self._conn
+        if conn.execute("SELECT 1 FROM rollups LIMIT 1").fetchone():
+            return
+        if not conn.execute("SELECT 1 FROM mentions LIMIT 1").fetchone():
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            buckets: Dict[Tuple[str, str, float], SymbolStats] = {}
+            for symbol, when, score in conn.execute("SELECT symbol, date, score FROM mentions ORDER BY date"):
+                self._add_to_rollups(buckets, [(symbol, score)], when)
+            self._save_rollups(buckets)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def history(self, symbol: str, interval: str, start: float, end: float) -> List[Dict]:
+        """Rollup buckets of symbol that start in [start, end) (POSIX seconds), oldest first.
+
+        Each point: {time (bucket start, ISO 8601 UTC), score (mean), label, mentions (count),
+        min, max, decayed_score, sum}. Buckets without mentions are omitted.
+        """
+        if interval not in ROLLUP_INTERVALS:
+            raise ValueError(f"interval must be one of {', '.join(ROLLUP_INTERVALS)}")
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT bucket, {', '.join(_STATS_COLUMNS)} FROM rollups "
+                "WHERE symbol = ? AND interval = ? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+                (symbol, interval, start - start % ROLLUP_INTERVALS[interval], end),
+            ).fetchall()
+        points = []
+        for bucket, count, total, low, high, decayed_sum, decayed_weight, _ in rows:
+            mean = total / count
+            points.append({
+                "time": datetime.fromtimestamp(bucket, timezone.utc).isoformat(),
+                "score": round(mean, 3),
+                "label": sentiment_label(mean),
+                "mentions": count,
+                "min": round(low, 3),
+                "max": round(high, 3),
+                "decayed_score": round(decayed_sum / decayed_weight, 3),
+                "sum": round(total, 3),
+            })
+        return points
+
+    def load_stats(self) -> Dict[str, SymbolStats]:
+        with self._lock:
+            rows = self._conn.execute(f"SELECT symbol, {', '.join(_STATS_COLUMNS)} FROM symbol_stats").fetchall()
+        return {row[0]: _stats_from_row(row[1:]) for row in rows}
+
+    def load_aggregator(self, symbols: Iterable[str]) -> SentimentAggregator:
+        """Aggregates of the given symbols as stored (one small table read)."""
+        aggregator = SentimentAggregator(symbols)
+        aggregator.restore(self.load_stats())
+        return aggregator
+
+    def recent_articles(self, since: float) -> List[Dict]:
+        """Stored articles published since `since` (POSIX seconds), newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT title, source, url, date, companies, score FROM articles WHERE date >= ? ORDER BY date DESC",
+                (since,),
+            ).fetchall()
+        return [
+            {
+                'title': title, 'source': source, 'url': url, 'date': datetime.fromtimestamp(date),
+                'mentioned_companies': json.loads(companies), 'score': score,
+            }
+            for title, source, url, date, companies, score in rows
+        ]
@@ -0,0 +1,6 @@
+"""Modules of this folder import each other by name (run from sentiment/)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,98 @@
+"""
+Former implementations and fixtures the equivalence tests compare against.
+benchmark.py times the current code against the same references.
+"""
+
+import glob
+import os
+import random
+import re
+from typing import List, Tuple
+
+SAMPLE_SENTENCES = [
+    "ATB annonce des résultats exceptionnels avec une croissance de 25% et des profits records.",
+    "La banque affiche un bénéfice en hausse malgré un ralentissement du marché.",
+    "BH présente des performances stables dans le secteur immobilier. Pas de changement significatif.",
+    "Le titre recule après un avertissement sur la dette et un risque de déficit.",
+    "تونس تليكوم تحقق نمو قوي في الأرباح مع ارتفاع عدد المشتركين.",
+    "تواجه الشركة أزمة مالية كبيرة قد تؤدي إلى خسائر فادحة للمساهمين.",
+    "The market shows mixed results with some gains and some losses. Overall stability maintained.",
+    "Tunisie Telecom reports strong growth in mobile data and a record dividend.",
+    "Insurance companies face a slowdown and a weak first quarter.",
+    "Le secteur bancaire reste solide, sans problème de liquidité selon la BCT.",
+]
+
+
+def legacy_clean_text(text: str) -> str:
+    """clean_text as it was before the single-scan version (reference for equivalence)."""
+    if not text:
+        return ""
+    text = re.sub(r"http\S+|www\S+|https\S+", "", text, flags=re.MULTILINE)
+    text = re.sub(r"<.*?>", "", text)
+    text = re.sub(r"[^\w\s\u0600-\u06FF\u00C0-\u017F.,!?;:\'-]", " ", text)
+    return " ".join(text.split())
+
+
+def markup_corpus(n: int, seed: int = 3) -> List[str]:
+    """Texts mixing sample sentences with URLs, tags, symbols and odd whitespace."""
+    rnd = random.Random(seed)
+    noise = [
+        "<p>", "</p>", "<a href='https://www.ilboursa.com/x?id=1'>", "</a>", "http://kapitalis.com/a-b",
+        "www.lapresse.tn", "«", "»", "—", "€", "25%", "\t", "\n\n", "\u00a0", "(", ")", "#BVMT", "@ATB",
+        "l'entreprise", "aujourd'hui", "<br/>", "&nbsp;", "1 200,5", "﴾", "٪", "ـــ", "<", ">", "wwwx", "httpx",
+    ]
+    words = " ".join(SAMPLE_SENTENCES).split()
+    return ["".join(rnd.choice([" ", "", " "]) + rnd.choice(words + noise) for _ in range(rnd.randint(0, 120))) for _ in range(n)]
+
+
+def homepage_fixture(seed: int, cards: int = 300) -> bytes:
+    """Synthetic news homepage: nav, scripts, sidebars and `cards` article teasers (~300 KB)."""
+    rnd = random.Random(seed)
+    words = " ".join(SAMPLE_SENTENCES).split()
+
+    def para(n):
+        return " ".join(rnd.choice(words) for _ in range(n))
+
+    parts = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>Actualités</title>']
+    parts += [f"<script>var cfg{i} = {{'a': '{para(30)}'}};</script>" for i in range(20)]
+    parts.append("<style>" + ".c{margin:0} " * 400 + "</style></head><body>")
+    parts.append('<nav class="menu">' + "".join(f'<a href="/s{i}">{para(2)}</a>' for i in range(80)) + "</nav>")
+    parts.append('<main><div class="news-list">')
+    for i in range(cards):
+        parts.append(
+            f'<article class="post card-{i}"><div class="thumb"><img src="/i{i}.jpg"></div>'
+            f'<h2><a href="/a{i}">{para(10)}</a></h2><p class="meta">{para(4)}</p>'
+            f"<p>{para(60)}</p><!-- ad slot --><div class='share'>{para(3)}</div></article>"
+        )
+        if i % 10 == 9:
+            parts.append(f'<aside class="widget">{para(120)}</aside>')
+    parts.append("</div></main><footer>" + para(300) + "</footer></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def html_fixtures() -> List[bytes]:
+    """Saved pages from BVMT_HTML_FIXTURES (a directory of .html files), else synthetic ones."""
+    directory = os.environ.get("BVMT_HTML_FIXTURES")
+    if directory:
+        paths = sorted(glob.glob(os.path.join(directory, "*.html")))
+        if paths:
+            pages = []
+            for path in paths:
+                with open(path, "rb") as f:
+                    pages.append(f.read())
+            return pages
+    return [homepage_fixture(seed) for seed in range(5)]
+
+
+def legacy_extract(content: bytes, limit: int = 5) -> Tuple[List[Tuple[str, str]], int]:
+    """BeautifulSoup html.parser extraction as _scrape_from_sources did it (reference)."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, "html.parser")
+    elements = soup.find_all(["article", "div"], class_=re.compile("article|post|news", re.I))
+    extracted = []
+    for elem in elements[:limit]:
+        title_elem = elem.find(["h1", "h2", "h3", "a"])
+        if title_elem:
+            extracted.append((title_elem.get_text(strip=True), elem.get_text(strip=True)[:500]))
+    return extracted, len(elements)
@@ -0,0 +1,115 @@
+import itertools
+
+from analyzer import NEGATION_WINDOW, Lexicon, SentimentAnalyzer
+from companies import CompanyMatcher
+from legacy import legacy_clean_text, markup_corpus
+from tokens import TokenIndex
+
+SENTENCES = [
+    "ATB annonce des résultats exceptionnels avec une croissance de 25% et des profits records.",
+    "La banque affiche un bénéfice en hausse malgré un ralentissement du marché.",
+    "BH présente des performances stables dans le secteur immobilier. Pas de changement significatif.",
+    "Le titre recule après un avertissement sur la dette et un risque de déficit.",
+    "تونس تليكوم تحقق نمو قوي في الأرباح مع ارتفاع عدد المشتركين.",
+    "تواجه الشركة أزمة مالية كبيرة قد تؤدي إلى خسائر فادحة للمساهمين.",
+    "The market shows mixed results with some gains and some losses. Overall stability maintained.",
+    "Insurance companies face a slowdown and a weak first quarter.",
+    "Court.",
+]
+TEXTS = [" ".join(pair) for pair in itertools.product(SENTENCES, repeat=2)]
+SYMBOLS = [("ATB", "BH", None)[i % 3] for i in range(len(TEXTS))]
+MATCHER = CompanyMatcher(
+    ["ATB", "BH", "TUNTEL"],
+    {"ATB": {"fr": "Arab Tunisian Bank"}, "BH": {"fr": "Banque de l'Habitat"}, "TUNTEL": {"ar": "تونس تليكوم"}},
+)
+
+
+def test_batch_matches_per_item_results():
+    analyzer = SentimentAnalyzer(cache_size=0)
+    for explain, companies in ((True, None), (False, None), (False, MATCHER)):
+        expected = [analyzer.analyze_sentiment(t, s, explain, companies) for t, s in zip(TEXTS, SYMBOLS)]
+        assert analyzer.analyze_batch(TEXTS, SYMBOLS, explain, companies) == expected
+
+
+def test_batch_with_cache_matches_uncached():
+    expected = SentimentAnalyzer(cache_size=0).analyze_batch(TEXTS, SYMBOLS, explain=False)
+    analyzer = SentimentAnalyzer()
+    assert analyzer.analyze_batch(TEXTS, SYMBOLS, explain=False) == expected
+    assert analyzer.analyze_batch(TEXTS, SYMBOLS, explain=False) == expected
+
+
+def test_clean_text_matches_former_substitutions():
+    analyzer = SentimentAnalyzer(cache_size=0)
+    for text in markup_corpus(5000):
+        assert analyzer.clean_text(text) == legacy_clean_text(text), text
+
+
+def test_explain_false_keeps_scores():
+    analyzer = SentimentAnalyzer(cache_size=0)
+    full = analyzer.analyze_batch(TEXTS, SYMBOLS)
+    scored = analyzer.analyze_batch(TEXTS, SYMBOLS, explain=False)
+    for a, b in zip(full, scored):
+        assert (a["score"], a["label"], a["confidence"]) == (b["score"], b["label"], b["confidence"])
+        assert b["explanation"] is None and b["explanation_detail"] is None
+
+
+def test_cached_results_do_not_share_nested_values():
+    analyzer = SentimentAnalyzer()
+    first = analyzer.analyze_sentiment(TEXTS[1], "ATB", True, MATCHER)
+    first["explanation_detail"].clear()
+    first["companies"]["ATB"]["score"] = -1.0
+    again = analyzer.analyze_sentiment(TEXTS[1], "ATB", True, MATCHER)
+    again["companies"]["BH"] = {}
+    assert analyzer.analyze_sentiment(TEXTS[1], "ATB", True, MATCHER) == SentimentAnalyzer(
+        cache_size=0
+    ).analyze_sentiment(TEXTS[1], "ATB", True, MATCHER)
+
+
+def test_lexicon_cache_is_bounded():
+    analyzer = SentimentAnalyzer(cache_size=0)
+    for i in range(Lexicon._CACHE_SIZE * 3):
+        analyzer.update_company_keywords("ATB", positive=[f"mot{i}"])
+    assert len(Lexicon._cache) <= Lexicon._CACHE_SIZE
+    assert analyzer.analyze_sentiment("ATB mot23 hausse", "ATB")["score"] > 0
+
+
+def _count(analyzer, text):
+    """(scopes, positive_found, negative_found) of a text"""
+    index = TokenIndex(text)
+    hits = analyzer.lexicon.find(index)
+    scopes = analyzer.lexicon.negation_scopes(index, hits)
+    positive, negative, _ = analyzer._count_hits(hits, scopes)
+    return scopes, [w for w, _, _ in positive], [w for w, _, _ in negative]
+
+
+def test_negation_flips_keywords_within_the_window():
+    analyzer = SentimentAnalyzer(cache_size=0)
+    scopes, positive, negative = _count(analyzer, "aucun signe de hausse")
+    assert scopes == {1: "aucun", 2: "aucun", 3: "aucun"}
+    assert (positive, negative) == ([], ["aucun hausse"])
+    # A phrase modifier negates a negative keyword into a positive one
+    _, positive, negative = _count(analyzer, "pas de perte cette année")
+    assert set(positive) == {"pas de perte"} and negative == []
+    assert analyzer.analyze_sentiment("pas de perte cette année")["label"] == "positive"
+
+
+def test_negation_stops_at_punctuation():
+    analyzer = SentimentAnalyzer(cache_size=0)
+    scopes, positive, negative = _count(analyzer, "sans hausse, la dette")
+    assert scopes == {1: "sans"}
+    assert (positive, negative) == ([], ["sans hausse", "dette"])
+
+
+def test_negation_does_not_reach_past_the_window():
+    analyzer = SentimentAnalyzer(cache_size=0)
+    assert NEGATION_WINDOW == 3
+    scopes, positive, negative = _count(analyzer, "sans vraiment de grande hausse")
+    assert 4 not in scopes
+    assert (positive, negative) == (["hausse"], [])
+
+
+def test_nearest_modifier_owns_the_scope():
+    analyzer = SentimentAnalyzer(cache_size=0)
+    scopes, positive, negative = _count(analyzer, "ne montre pas de croissance")
+    assert scopes[4] == "pas de"
+    assert (positive, negative) == ([], ["pas de croissance"])
@@ -0,0 +1,242 @@
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")  # needed by fastapi.testclient
+
+from fastapi.testclient import TestClient
+
+import api
+from dedup import DedupIndex
+from scraper_new import SmartNewsScraper
+from store import ArticleStore
+
+ARTICLES = [
+    {
+        "title": "ATB annonce des résultats exceptionnels",
+        "content": "Arab Tunisian Bank affiche une croissance record et des profits en forte hausse.",
+        "source": "ilboursa",
+        "url": "https://www.ilboursa.com/news/1",
+        "date": datetime(2026, 10, 1, 10, 30, tzinfo=timezone.utc),
+        "mentioned_companies": ["ATB"],
+    },
+]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    scraper = SmartNewsScraper(cache_dir=None)
+    monkeypatch.setattr(scraper, "get_articles_last_week", lambda: [dict(a) for a in ARTICLES])
+    monkeypatch.setenv("BVMT_DEEP_FETCH", "0")
+    monkeypatch.setattr(api, "_scraper", scraper)
+    monkeypatch.setattr(api, "_store", ArticleStore(str(tmp_path / "store.sqlite3")))
+    monkeypatch.setattr(api, "_dedup", DedupIndex(str(tmp_path / "dedup.sqlite3")))
+    monkeypatch.setattr(api, "_snapshot", None)
+    monkeypatch.setattr(api, "_pool", None)
+    # The app's lifespan (background refresh) only runs when the client is used as a context manager
+    return TestClient(api.app)
+
+
+@pytest.fixture
+def non_utc_host(monkeypatch):
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is not available on this platform")
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_history_reads_naive_range_as_utc(client, non_utc_host):
+    response = client.get("/sentiment/ATB/history", params={
+        "interval": "1h", "from": "2026-10-01T10:00:00", "to": "2026-10-01T11:00:00",
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["from"] == "2026-10-01T10:00:00+00:00"
+    assert [point["time"] for point in body["data"]] == ["2026-10-01T10:00:00+00:00"]
+    assert body["data"][0]["mentions"] == 1
+
+
+def test_history_errors_carry_snapshot_headers(client):
+    for path, status in (("/sentiment/NOPE/history", 404), ("/sentiment/ATB/history?interval=5m", 400)):
+        response = client.get(path)
+        assert response.status_code == status
+        assert "Age" in response.headers
+        assert "X-Snapshot-Build-Seconds" in response.headers
+
+
+def test_batch_without_body_returns_every_symbol(client):
+    response = client.post("/sentiment/batch")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == len(api._scraper.stock_symbols)
+    assert body["data"][0]["symbol"] == "ATB"
+    assert body["unknown"] == []
+
+
+def test_batch_filters_and_projects(client):
+    response = client.post("/sentiment/batch", json={
+        "symbols": ["stb", "NOPE", "ATB", "SIMPAR"], "sector": "Bancaire", "fields": ["score"],
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert [row["symbol"] for row in body["data"]] == ["STB", "ATB"]
+    assert all(set(row) == {"symbol", "score"} for row in body["data"])
+    assert body["unknown"] == ["NOPE"]
+    assert client.post("/sentiment/batch", json={"fields": ["price"]}).status_code == 400
+
+
+def test_batch_with_empty_fields_returns_symbols_only(client):
+    body = client.post("/sentiment/batch", json={"symbols": ["ATB", "BH"], "fields": []}).json()
+    assert body["data"] == [{"symbol": "ATB"}, {"symbol": "BH"}]
+
+
+def test_forced_refresh_does_not_reuse_a_lazier_one(monkeypatch):
+    builds = []
+    building = threading.Semaphore(0)
+    releases = [threading.Event(), threading.Event()]
+
+    def build(max_age):
+        builds.append(max_age)
+        building.release()
+        releases[len(builds) - 1].wait(5)
+        return {"max_age": max_age}
+
+    monkeypatch.setattr(api, "_build_snapshot", build)
+    monkeypatch.setattr(api, "_snapshot", None)
+    results = []
+
+    def refresh(max_age):
+        thread = threading.Thread(target=lambda: results.append(api.refresh_snapshot(max_age=max_age)))
+        thread.start()
+        time.sleep(0.2)  # waiting on the refresh lock
+        return thread
+
+    # A TTL refresh is running when POST /refresh (max_age=0) arrives: it must scrape anyway
+    threads = [refresh(600)]
+    assert building.acquire(timeout=5)
+    threads.append(refresh(0))
+    releases[0].set()
+    assert building.acquire(timeout=5)
+    # A lazier caller arriving during the forced refresh reuses it
+    threads.append(refresh(600))
+    releases[1].set()
+    for thread in threads:
+        thread.join(5)
+    assert builds == [600, 0]
+    assert [r["max_age"] for r in results] == [600, 0, 0]
+
+
+def test_other_workers_writes_are_reloaded_in_the_background(client, tmp_path, monkeypatch):
+    assert client.get("/sentiment/ATB").json()["mentions"] == 1
+    other_worker = ArticleStore(str(tmp_path / "store.sqlite3"))
+    article = {**ARTICLES[0], "title": "ATB relève ses objectifs", "url": "https://www.ilboursa.com/news/2"}
+    other_worker.add([article], [{"score": 0.5, "label": "positive"}])
+
+    load_snapshot = api._load_snapshot
+    release = threading.Event()
+
+    def slow_load(*args):
+        release.wait(5)
+        return load_snapshot(*args)
+
+    monkeypatch.setattr(api, "_load_snapshot", slow_load)
+    monkeypatch.setattr(api, "_store_checked", 0.0)
+    old = api._snapshot
+    # The request that notices the write is served the current snapshot without waiting
+    assert api._get_data() is old
+    release.set()
+    for _ in range(100):
+        if api._snapshot is not old:
+            break
+        time.sleep(0.05)
+    assert client.get("/sentiment/ATB").json()["mentions"] == 2
+    other_worker.close()
+
+
+def _accept(header):
+    return api._accepted_encoding(SimpleNamespace(headers={"accept-encoding": header}), ("br", "gzip"))
+
+
+def test_accepted_encoding_follows_q_values():
+    assert _accept("gzip;q=1, br;q=0.1") == "gzip"
+    assert _accept("gzip;q=0.5, br") == "br"
+    assert _accept("gzip, br") == "br"  # tie: server preference
+    assert _accept("br;q=0, gzip") == "gzip"
+    assert _accept("br;q=0, gzip;q=0") is None
+    assert _accept("*") == "br"
+    assert _accept("*;q=0.2, gzip;q=0.5") == "gzip"
+    assert _accept("identity") is None
+    assert _accept("") is None
+
+
+def test_list_responses_are_compressed_as_accepted(client):
+    response = client.get("/sentiment/all", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["ETag"].endswith('-gzip"')
+    plain = client.get("/sentiment/all", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["Vary"] == "Accept-Encoding"
+    assert plain.json() == response.json()
+
+
+def test_if_none_match_returns_304(client):
+    response = client.get("/sentiment/ATB")
+    etag = response.headers["ETag"]
+    assert etag.startswith('"') and "Vary" not in response.headers
+    for header in (etag, f"W/{etag}", '"other", ' + etag, "*"):
+        cached = client.get("/sentiment/ATB", headers={"If-None-Match": header})
+        assert cached.status_code == 304, header
+        assert cached.headers["ETag"] == etag and cached.content == b""
+    assert client.get("/sentiment/ATB", headers={"If-None-Match": '"other"'}).status_code == 200
+    assert client.get("/sentiment/BH").headers["ETag"] != etag
+
+
+def test_compressed_bodies_have_their_own_etag(client):
+    plain = client.get("/sentiment/all", headers={"Accept-Encoding": "identity"}).headers["ETag"]
+    gzipped = client.get("/sentiment/all", headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    assert gzipped == plain[:-1] + '-gzip"'
+    for etag in (plain, gzipped):
+        assert client.get("/sentiment/all", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}).status_code == 304
+    # The gzip tag does not validate the identity body
+    assert client.get("/sentiment/all", headers={"Accept-Encoding": "identity", "If-None-Match": gzipped}).status_code == 200
+
+
+def test_history_etag_follows_the_store(client, tmp_path, monkeypatch):
+    path = "/sentiment/ATB/history?interval=1d&from=2026-09-01&to=2026-11-01"
+    first = client.get(path)
+    etag = first.headers["ETag"]
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    # Articles stored between snapshots (another worker, or this one mid-refresh) change the body
+    monkeypatch.setattr(api, "STORE_POLL_INTERVAL", 3600.0)
+    monkeypatch.setattr(api, "_store_checked", time.monotonic())
+    other_worker = ArticleStore(str(tmp_path / "store.sqlite3"))
+    article = {**ARTICLES[0], "title": "ATB relève ses objectifs", "url": "https://www.ilboursa.com/news/2"}
+    other_worker.add([article], [{"score": 0.5, "label": "positive"}])
+    other_worker.close()
+    second = client.get(path, headers={"If-None-Match": etag})
+    assert second.status_code == 200 and second.json()["data"][0]["mentions"] == 2
+
+    article = {**ARTICLES[0], "title": "ATB ouvre une agence", "url": "https://www.ilboursa.com/news/3"}
+    api._store.add([article], [{"score": 0.5, "label": "positive"}])
+    third = client.get(path, headers={"If-None-Match": second.headers["ETag"]})
+    assert third.status_code == 200 and third.json()["data"][0]["mentions"] == 3
+
+
+def test_analysis_pool_lives_as_long_as_the_app(client, monkeypatch):
+    monkeypatch.setattr(api, "start_background_refresh", lambda: None)
+    with client:
+        client.post("/refresh")
+        pool = api._pool
+        assert pool is not None
+        client.post("/refresh")
+        assert api._pool is pool
+    assert api._pool is None
@@ -0,0 +1,93 @@
+import random
+
+from analyzer import SentimentAnalyzer
+from companies import CompanyMatcher, _is_all_caps
+from legacy import SAMPLE_SENTENCES
+from scraper_new import SmartNewsScraper
+from tokens import tokenize
+
+SCRAPER = SmartNewsScraper(cache_dir=None)
+
+
+def _aliases(symbol):
+    data = SCRAPER.company_data.get(symbol, {})
+    for alias in (symbol, data.get("fr"), data.get("ar")):
+        if alias:
+            cased = alias == symbol or _is_all_caps(alias)
+            yield tuple(tokenize(alias, keep_case=cased)), cased
+
+
+def _reference_mentions(text):
+    """Every symbol with an alias occurring as whole words (a scan per alias)."""
+    cased_tokens = tokenize(text, keep_case=True)
+    haystacks = {True: cased_tokens, False: [t.lower() for t in cased_tokens]}
+    found = set()
+    for symbol in SCRAPER.stock_symbols:
+        for alias, cased in _aliases(symbol):
+            tokens, n = haystacks[cased], len(alias)
+            if n and any(tuple(tokens[i:i + n]) == alias for i in range(len(tokens) - n + 1)):
+                found.add(symbol)
+    return found
+
+
+def _overlapping_symbols():
+    """Symbols with an alias inside another company's longer alias (resolved to the longer one)."""
+    aliases = [(alias, symbol) for symbol in SCRAPER.stock_symbols for alias, _ in _aliases(symbol)]
+    lowered = [(tuple(t.lower() for t in alias), symbol) for alias, symbol in aliases]
+    overlapping = set()
+    for short, symbol in lowered:
+        for long, other in lowered:
+            if other != symbol and len(long) > len(short) and any(
+                long[i:i + len(short)] == short for i in range(len(long) - len(short) + 1)
+            ):
+                overlapping.update((symbol, other))
+    return overlapping
+
+
+def test_matcher_matches_per_alias_scan():
+    matcher = SCRAPER.company_matcher
+    skip = _overlapping_symbols()
+    rnd = random.Random(11)
+    names = [alias for symbol in SCRAPER.stock_symbols if symbol not in skip
+             for alias in (symbol, *(SCRAPER.company_data.get(symbol, {}).get(k) for k in ("fr", "ar"))) if alias]
+    for _ in range(200):
+        parts = [rnd.choice(SAMPLE_SENTENCES) for _ in range(6)]
+        for _ in range(3):
+            parts.insert(rnd.randrange(len(parts)), rnd.choice(names))
+        text = " ".join(parts)
+        assert set(matcher.mentions(text)) - skip == _reference_mentions(text) - skip, text
+
+
+def test_longest_overlapping_name_wins():
+    matcher = CompanyMatcher(["ATB", "STB"], {"ATB": {"ar": "البنك التونسي العربي"}, "STB": {"ar": "البنك التونسي"}})
+    assert matcher.mentions("أعلن البنك التونسي العربي عن أرباح") == ["ATB"]
+    assert matcher.mentions("أعلن البنك التونسي عن أرباح") == ["STB"]
+
+
+def test_case_sensitive_symbols():
+    matcher = CompanyMatcher(["ATLAS"], {"ATLAS": {"fr": "ATLAS"}})
+    assert matcher.mentions("Randonnée dans l'Atlas") == []
+    assert matcher.mentions("ATLAS publie ses comptes") == ["ATLAS"]
+
+
+def test_attribution_scores_each_company_on_its_sentences():
+    analyzer = SentimentAnalyzer(cache_size=0)
+    matcher = SCRAPER.company_matcher
+    text = (
+        "ATB annonce des résultats exceptionnels avec une croissance record et des profits en hausse. "
+        "STB fait face à une crise, une perte importante et un risque de déficit."
+    )
+    companies = analyzer.analyze_sentiment(text, explain=False, companies=matcher)["companies"]
+    assert companies["ATB"]["scope"] == companies["STB"]["scope"] == "sentence"
+    assert companies["ATB"]["score"] > 0 > companies["STB"]["score"]
+
+    # A company mentioned in every sentence gets the article's score
+    whole = "ATB annonce une croissance record. ATB publie des profits en hausse."
+    result = analyzer.analyze_sentiment(whole, explain=False, companies=matcher)
+    assert result["companies"]["ATB"]["score"] == result["score"]
+
+    # Sentences without sentiment keywords fall back to the article's score
+    neutral = "ATB tient son assemblée mardi. Le marché affiche une croissance record et des profits."
+    result = analyzer.analyze_sentiment(neutral, explain=False, companies=matcher)
+    assert result["companies"]["ATB"]["scope"] == "article"
+    assert result["companies"]["ATB"]["score"] == result["score"]
@@ -0,0 +1,74 @@
+from dedup import DedupIndex, normalize_url, simhash
+
+HOMEPAGE = "https://www.ilboursa.com/"
+
+
+def _article(title, content, url=HOMEPAGE):
+    return {"source": "ilboursa", "title": title, "content": content, "url": url}
+
+
+LINKLESS = [
+    _article("ATB publie ses résultats", "La banque annonce une hausse de son produit net bancaire de 12%."),
+    _article("Tunisie Telecom recrute", "L'opérateur lance un programme de recrutement de cent ingénieurs."),
+    _article("La BVMT clôture en baisse", "Le Tunindex perd 0,4% dans un marché peu animé cette semaine."),
+]
+
+
+def test_normalize_url_drops_tracking_and_www():
+    assert normalize_url("HTTP://www.Example.com/a/?utm_source=x&b=2&a=1#top") == "https://example.com/a?a=1&b=2"
+    assert normalize_url("N/A") is None
+
+
+def test_articles_without_own_link_are_matched_by_simhash_only(tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite3"), homepages=[HOMEPAGE])
+    fresh = index.filter_new(LINKLESS)
+    assert len(fresh) == 3
+    index.add(fresh)
+
+    new = _article("SFBT distribue un dividende", "Le brasseur propose un dividende en hausse à ses actionnaires.")
+    fresh = index.filter_new(LINKLESS + [new])
+    assert [a["title"] for a in fresh] == [new["title"]]
+    index.close()
+
+
+def test_same_link_is_a_duplicate(tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite3"), homepages=[HOMEPAGE])
+    first = _article("ATB publie ses résultats", "Texte court.", url="https://www.ilboursa.com/news/1?utm_medium=rss")
+    other = _article("Titre tout à fait différent", "Un autre texte sans rapport.", url="https://ilboursa.com/news/1")
+    index.add(index.filter_new([first]))
+    assert index.filter_new([other]) == []
+    index.close()
+
+
+def test_templated_articles_of_one_source_are_kept(tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite3"), homepages=[HOMEPAGE])
+    companies = [f"Société {chr(65 + i // 26)}{chr(65 + i % 26)}" for i in range(40)]
+    templated = [
+        _article(
+            f"{company} : convocation à l'assemblée générale",
+            f"La société {company} informe ses actionnaires que l'assemblée générale ordinaire se tiendra "
+            "le 15 octobre à son siège social pour approuver les comptes de l'exercice.",
+            url=f"https://www.ilboursa.com/news/{i}",
+        )
+        for i, company in enumerate(companies)
+    ]
+    fresh = index.filter_new(templated)
+    assert len(fresh) == 40
+    index.add(fresh)
+    assert index.filter_new(templated) == []
+
+    # The same text from another source is still the same story
+    syndicated = {**templated[0], "source": "webmanagercenter", "url": "https://www.webmanagercenter.com/a/1"}
+    assert index.filter_new([syndicated]) == []
+    index.close()
+
+
+def test_short_texts_are_matched_by_url_only(tmp_path):
+    assert simhash("") is None and simhash("ATB : communiqué") is None
+    index = DedupIndex(str(tmp_path / "dedup.sqlite3"), homepages=[HOMEPAGE])
+    briefs = [_article(title, "") for title in ("ATB : communiqué", "BH : communiqué", "Indicateurs")]
+    fresh = index.filter_new(briefs)
+    assert [a["title"] for a in fresh] == [a["title"] for a in briefs]
+    index.add(fresh)
+    assert len(index.filter_new(briefs)) == 3
+    index.close()
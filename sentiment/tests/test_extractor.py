@@ -0,0 +1,44 @@
+import pytest
+
+import extractor
+from extractor import SourceProfile, extract_articles
+from legacy import homepage_fixture, html_fixtures, legacy_extract
+
+EDGE_PAGE = (
+    '<html><body><div class="news-list">'
+    '<div class="post"><p>Pas de titre ici.</p></div>'
+    '<article class="news"><h3>BIAT : hausse du PNB</h3><p>Le produit net bancaire progresse.</p>'
+    '<div class="article-inner"><a href="/x">Lien imbriqué</a> texte</div></article>'
+    '<script>var x = 1;</script>'
+    "</div></body></html>"
+).encode("utf-8")
+
+
+def test_unmatched_container_reuses_the_parsed_page(monkeypatch):
+    profile = SourceProfile({"name": "test", "url": "https://example.com/", "container": "//li[@class='nothing']"})
+    pages = [homepage_fixture(seed, cards=40) for seed in range(3)] + [EDGE_PAGE]
+    expected = [extract_articles(page, 5, 500) for page in pages]
+
+    def no_second_parse(*args, **kwargs):
+        raise AssertionError("page parsed twice")
+
+    monkeypatch.setattr(extractor, "extract_articles", no_second_parse)
+    for page, (articles, found) in zip(pages, expected):
+        extracted, matched = profile.extract(page, limit=5, text_limit=500)
+        assert matched == found
+        assert [(a["title"], a["text"]) for a in extracted] == articles
+
+
+def test_profile_without_container_streams():
+    profile = SourceProfile({"name": "test", "url": "https://example.com/"})
+    articles, found = extract_articles(EDGE_PAGE)
+    extracted, matched = profile.extract(EDGE_PAGE)
+    assert matched == found == 4  # the news-list wrapper matches too
+    assert [(a["title"], a["text"]) for a in extracted] == articles
+
+
+def test_matches_former_beautifulsoup_extraction():
+    pytest.importorskip("bs4")
+    for page in html_fixtures() + [EDGE_PAGE]:
+        # Element counts differ by design: the extractor stops after the limit
+        assert extract_articles(page)[0] == legacy_extract(page)[0]
@@ -0,0 +1,104 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_cache import HttpCache
+
+LAST_MODIFIED = "Thu, 01 Oct 2026 10:00:00 GMT"
+
+
+def _etag(body):
+    return '"%s"' % body.decode()[6:8]
+
+
+@pytest.fixture
+def site():
+    """Stub server with one page; page["body"] changes it, page["requests"] records request headers."""
+    page = {"body": b"<html>v1</html>", "requests": []}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            page["requests"].append(dict(self.headers))
+            etag = _etag(page["body"])
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", LAST_MODIFIED)
+            self.send_header("Content-Length", str(len(page["body"])))
+            self.end_headers()
+            self.wfile.write(page["body"])
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    page["url"] = f"http://127.0.0.1:{server.server_address[1]}/news"
+    yield page
+    server.shutdown()
+    server.server_close()
+
+
+def test_conditional_get_reuses_the_cached_body(site, tmp_path):
+    cache = HttpCache(str(tmp_path))
+    with requests.Session() as session:
+        first = cache.fetch(session, site["url"], 5)
+        assert (first.changed, first.status_code, first.content) == (True, 200, b"<html>v1</html>")
+        assert "If-None-Match" not in site["requests"][0]
+
+        again = cache.fetch(session, site["url"], 5)
+        assert (again.changed, again.status_code, again.content) == (False, 304, b"<html>v1</html>")
+        assert site["requests"][1]["If-None-Match"] == '"v1"'
+        assert site["requests"][1]["If-Modified-Since"] == LAST_MODIFIED
+
+        site["body"] = b"<html>v2</html>"
+        changed = cache.fetch(session, site["url"], 5)
+        assert (changed.changed, changed.content) == (True, b"<html>v2</html>")
+
+
+def test_min_interval_skips_the_request(site, tmp_path):
+    cache = HttpCache(str(tmp_path))
+    with requests.Session() as session:
+        cache.fetch(session, site["url"], 5)
+        site["body"] = b"<html>v2</html>"
+        cached = cache.fetch(session, site["url"], 5, min_interval=60)
+        assert (cached.changed, cached.content) == (False, b"<html>v1</html>")
+        assert len(site["requests"]) == 1
+        assert cache.fetch(session, site["url"], 5, min_interval=0).content == b"<html>v2</html>"
+
+
+def test_parsed_data_needs_the_same_parse_version(site, tmp_path):
+    cache = HttpCache(str(tmp_path))
+    with requests.Session() as session:
+        cache.fetch(session, site["url"], 5, parse_version="1")
+        cache.store_parsed(site["url"], [{"title": "ATB"}], parse_version="1")
+        assert cache.fetch(session, site["url"], 5, parse_version="1").parsed == [{"title": "ATB"}]
+        stale = cache.fetch(session, site["url"], 5, parse_version="2")
+        assert (stale.changed, stale.parsed) == (False, None)
+
+
+def test_body_without_its_metadata_is_not_revalidated(site, tmp_path, monkeypatch):
+    cache = HttpCache(str(tmp_path))
+    with requests.Session() as session:
+        cache.fetch(session, site["url"], 5)
+        # Crash after the new body is written, before its metadata
+        site["body"] = b"<html>v2</html>"
+
+        def crash(*args):
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(cache, "_save_meta", crash)
+        with pytest.raises(KeyboardInterrupt):
+            cache.fetch(session, site["url"], 5)
+        monkeypatch.undo()
+
+        site["body"] = b"<html>v1</html>"
+        result = cache.fetch(session, site["url"], 5)
+        assert "If-None-Match" not in site["requests"][-1]
+        assert (result.changed, result.content) == (True, b"<html>v1</html>")
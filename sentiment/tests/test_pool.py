@@ -0,0 +1,22 @@
+from analyzer import SentimentAnalyzer
+from pool import AnalysisPool
+from test_analyzer import MATCHER, SYMBOLS, TEXTS
+
+
+def test_pool_matches_in_process_batch():
+    expected = SentimentAnalyzer(cache_size=0).analyze_batch(TEXTS, SYMBOLS, explain=False, companies=MATCHER)
+    with AnalysisPool(2, SentimentAnalyzer(cache_size=0), chunk_size=20) as pool:
+        assert pool.analyze_batch(TEXTS, SYMBOLS, explain=False, companies=MATCHER) == expected
+        # The same workers serve the next batch
+        assert pool.analyze_batch(TEXTS, SYMBOLS, explain=False, companies=MATCHER) == expected
+
+
+def test_pool_workers_follow_keyword_updates():
+    analyzer = SentimentAnalyzer(cache_size=0)
+    texts = [f"ATB ouvre son agence numéro {i} à Sfax." for i in range(40)]
+    with AnalysisPool(2, analyzer, chunk_size=10) as pool:
+        assert {r["label"] for r in pool.analyze_batch(texts, ["ATB"] * 40)} == {"neutral"}
+        analyzer.update_company_keywords("ATB", positive=["agence"])
+        expected = analyzer.analyze_batch(texts, ["ATB"] * 40)
+        assert pool.analyze_batch(texts, ["ATB"] * 40) == expected
+        assert {r["label"] for r in expected} == {"positive"}
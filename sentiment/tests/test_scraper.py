@@ -0,0 +1,154 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pipeline import DeepFetchPipeline, HostRateLimiter
+from scraper_new import SmartNewsScraper
+
+PAGE = (
+    '<html><body><article class="news"><h2>ATB annonce des résultats en hausse</h2>'
+    "<p>Arab Tunisian Bank publie un bénéfice record pour le semestre.</p></article></body></html>"
+).encode("utf-8")
+SLOW_SECONDS = 5
+
+
+def _server(behaviour, release):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if behaviour == "slow":
+                release.wait(SLOW_SECONDS)
+            elif behaviour == "delayed":
+                time.sleep(0.5)
+            if behaviour == "fail":
+                self.send_error(500)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def hosts():
+    """One stub server (host) per behaviour: name -> URL."""
+    release = threading.Event()
+    servers = {name: _server(name, release) for name in ("slow", "fail", "fast", "delayed")}
+    yield {name: f"http://127.0.0.1:{server.server_address[1]}/" for name, server in servers.items()}
+    release.set()
+    for server in servers.values():
+        server.shutdown()
+        server.server_close()
+
+
+def test_deadline_keeps_healthy_hosts(hosts):
+    scraper = SmartNewsScraper(
+        sources=[{"name": name, "url": hosts[name]} for name in ("slow", "fail", "fast")],
+        timeout=SLOW_SECONDS, deadline=1, cache_dir=None,
+    )
+    start = time.monotonic()
+    articles = scraper._scrape_from_sources(since=None)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 2, "the slow host held the scrape past its deadline"
+    assert [(a["source"], a["mentioned_companies"]) for a in articles] == [("fast", ["ATB"])]
+    assert articles[0]["title"] == "ATB annonce des résultats en hausse"
+
+
+def test_sources_are_fetched_concurrently(hosts):
+    # Four sources answering in 0.5 s each: one after the other they would miss the deadline
+    scraper = SmartNewsScraper(
+        sources=[{"name": f"delayed{i}", "url": hosts["delayed"] + f"?page={i}"} for i in range(4)],
+        deadline=1.5, max_per_host=4, cache_dir=None,
+    )
+    articles = scraper._scrape_from_sources(since=None)
+    assert sorted(a["source"] for a in articles) == ["delayed0", "delayed1", "delayed2", "delayed3"]
+
+
+class _Scorer:
+    """analyze_batch stub; on_batch(texts) runs before each batch is scored"""
+
+    def __init__(self, on_batch=None):
+        self.on_batch = on_batch
+
+    def analyze_batch(self, texts, stock_symbols, explain=True, companies=None):
+        if self.on_batch is not None:
+            self.on_batch(texts)
+        return [{"score": 0.0, "label": "neutral"} for _ in texts]
+
+
+def _teasers(url, count, prefix):
+    return [
+        {"title": f"{prefix} {i}", "content": "Teaser.", "source": "stub", "url": f"{url}{prefix}{i}",
+         "mentioned_companies": ["ATB"]}
+        for i in range(count)
+    ]
+
+
+def test_deep_fetch_deadline_scores_late_articles_from_their_teaser(hosts):
+    scraper = SmartNewsScraper(sources=[], timeout=SLOW_SECONDS, cache_dir=None)
+    articles = _teasers(hosts["fast"], 3, "fast") + _teasers(hosts["slow"], 2, "slow")
+    pipeline = DeepFetchPipeline(scraper, _Scorer(), per_host_rate=0, deadline=1)
+
+    start = time.monotonic()
+    batches = list(pipeline.run(articles))
+    assert time.monotonic() - start < 2, "the slow host held the pipeline past its deadline"
+
+    scored = [article for batch, results in batches for article in batch]
+    assert sorted(a["title"] for a in scored) == sorted(a["title"] for a in articles)
+    assert all(len(results) == len(batch) for batch, results in batches)
+    assert [a["title"] for a in batches[-1][0]] == ["slow 0", "slow 1"]
+    assert all(a["content"] == "Teaser." for a in batches[-1][0])
+    assert all(a["content"].startswith("Arab Tunisian Bank") for batch, _ in batches[:-1] for a in batch)
+
+
+def test_deep_fetch_stops_fetching_ahead_of_scoring(hosts):
+    scraper = SmartNewsScraper(sources=[], max_per_host=4, cache_dir=None)
+    fetch = scraper.fetch
+    fetched = []
+
+    def counting_fetch(url, *args):
+        fetched.append(url)
+        return fetch(url, *args)
+
+    scraper.fetch = counting_fetch
+    seen_while_blocked = []
+
+    def slow_first_batch(texts):
+        if not seen_while_blocked:
+            time.sleep(0.5)
+            seen_while_blocked.append(len(fetched))
+
+    workers, queue_size = 4, 2
+    pipeline = DeepFetchPipeline(
+        scraper, _Scorer(slow_first_batch), workers=workers, per_host_rate=0, queue_size=queue_size,
+        batch_size=1, deadline=10,
+    )
+    batches = list(pipeline.run(_teasers(hosts["fast"], 20, "page")))
+    # While the first article is scored, at most queue_size wait in the queue and one per worker
+    assert seen_while_blocked[0] <= 1 + queue_size + workers
+    assert len(fetched) == 20 and sum(len(batch) for batch, _ in batches) == 20
+
+
+def test_host_rate_limiter_spaces_requests_and_respects_the_deadline():
+    limiter = HostRateLimiter(rate=5)
+    cancelled = threading.Event()
+    start = time.monotonic()
+    assert limiter.wait("http://a.example/1", start + 10, cancelled)
+    assert limiter.wait("http://a.example/2", start + 10, cancelled)
+    assert limiter.wait("http://b.example/1", start + 10, cancelled)
+    assert 0.15 < time.monotonic() - start < 0.5
+    # The next slot on a.example (0.4 s) is past this deadline
+    assert not limiter.wait("http://a.example/3", time.monotonic() + 0.1, cancelled)
+    cancelled.set()
+    assert not limiter.wait("http://a.example/4", time.monotonic() + 10, cancelled)
@@ -0,0 +1,55 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from store import ArticleStore
+
+PUBLISHED = datetime(2026, 9, 7, 9, 0, tzinfo=timezone.utc)
+RESULT = {"score": 0.5, "label": "positive"}
+
+
+def _bulletin(date):
+    return {
+        "title": "Bulletin de la cote", "content": "", "source": "bvmt", "url": None,
+        "date": date, "mentioned_companies": ["ATB"],
+    }
+
+
+def test_recurring_title_is_stored_again_after_the_window(tmp_path):
+    store = ArticleStore(str(tmp_path / "store.sqlite3"))
+    assert store.add([_bulletin(PUBLISHED)], [RESULT]) == 1
+
+    # Re-scraped the next day: same article
+    again = _bulletin(PUBLISHED + timedelta(days=1))
+    assert store.filter_new([again]) == []
+    assert store.add([again], [RESULT]) == 0
+
+    # A month later: a new bulletin under the same title
+    later = _bulletin(PUBLISHED + timedelta(days=30))
+    assert store.filter_new([later]) == [later]
+    assert store.add([later, later], [RESULT, RESULT]) == 1
+    assert store.load_stats()["ATB"].count == 2
+    store.close()
+
+
+def test_title_unique_databases_are_rebuilt(tmp_path):
+    path = str(tmp_path / "store.sqlite3")
+    store = ArticleStore(path)
+    store.add([_bulletin(PUBLISHED)], [RESULT])
+    store.close()
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("CREATE TABLE old AS SELECT * FROM articles")
+        conn.execute("DROP TABLE articles")
+        conn.execute(
+            "CREATE TABLE articles (id INTEGER PRIMARY KEY, source TEXT NOT NULL, title TEXT NOT NULL, url TEXT, "
+            "date REAL NOT NULL, companies TEXT NOT NULL, score REAL NOT NULL, label TEXT NOT NULL, "
+            "scored_at REAL NOT NULL, UNIQUE (source, title))"
+        )
+        conn.execute("INSERT INTO articles SELECT * FROM old")
+    conn.close()
+
+    store = ArticleStore(path)
+    assert store.filter_new([_bulletin(PUBLISHED)]) == []
+    assert store.add([_bulletin(PUBLISHED + timedelta(days=30))], [RESULT]) == 1
+    assert len(store.recent_articles(0)) == 2
+    store.close()
@@ -0,0 +1,28 @@
+from analyzer import SentimentAnalyzer
+from tokens import TokenIndex, word_forms
+
+
+def test_plural_and_feminine_forms_match_the_lexicon_word():
+    assert word_forms("gains") == ["gain"]
+    assert word_forms("fortes") == ["forte", "fort"]
+    assert word_forms("forte") == ["fort"]
+    assert word_forms("excellente") == ["excellent"]
+    assert word_forms("meilleure") == ["meilleur"]
+    assert word_forms("bonnes") == ["bonne", "bonn", "bon"]
+    assert word_forms("exceptionnelle") == ["exceptionnel"]
+    assert word_forms("note") == []
+
+
+def test_words_containing_a_lexicon_word_do_not_match():
+    index = TokenIndex("Le regain des efforts progresse fortement, note la banque.")
+    for word in ("gain", "fort", "not"):
+        assert index.find((word,)) == []
+
+
+def test_inflected_keywords_count():
+    analyzer = SentimentAnalyzer(cache_size=0)
+    for text in ("Une forte demande.", "Une excellente année.", "La meilleure marge."):
+        result = analyzer.analyze_sentiment(text)
+        assert result["label"] == "positive", text
+    for text in ("Le regain des marchés.", "Des efforts de la direction."):
+        assert analyzer.analyze_sentiment(text)["score"] == 0.0, text
@@ -0,0 +1,113 @@
+"""
+Word tokenization and per-document token index
+Keyword, phrase and negation lookups run against whole tokens, never raw substrings.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+# Words, plus the punctuation that breaks phrases (and ends sentences / negation scopes)
+_TOKEN_RE = re.compile(r"\w+|[.!?;:,،؛؟]")
+# Arabic diacritics (tashkeel), superscript alef and tatweel: not part of the word for matching
+_AR_MARKS_RE = re.compile("[\u064B-\u065F\u0670\u0640]+")
+# Definite article at the start of a word, alone or after a one-letter conjunction or
+# preposition, when at least two letters remain
+_AR_ARTICLE_RE = re.compile(r"\b(?:[وبكف]?ال|لل)(?=\w\w)")
+
+PUNCTUATION = frozenset(".!?;:,،؛؟")
+# Punctuation that ends a sentence
+SENTENCE_END = frozenset(".!?؟")
+
+
+def tokenize(text: str, keep_case: bool = False) -> List[str]:
+    """Lowercased tokens of text (words and phrase-breaking punctuation).
+
+    Arabic words are matched without diacritics and without the definite article
+    ('الخسارة' -> 'خسارة'). keep_case=True skips lowercasing (for case-sensitive lookups).
+    """
+    if not keep_case:
+        text = text.lower()
+    if not text.isascii():
+        text = _AR_ARTICLE_RE.sub("", _AR_MARKS_RE.sub("", text))
+    return _TOKEN_RE.findall(text)
+
+
+def word_forms(token: str) -> List[str]:
+    """Base forms a word is also indexed under: the singular of a plural ("gains" -> "gain",
+    "losses" -> "loss") and the masculine of a French feminine ("forte" -> "fort",
+    "bonnes" -> "bon", "exceptionnelle" -> "exceptionnel").
+
+    Only suffixes are removed, so a word never matches a lexicon word it merely contains
+    ("regain", "efforts", "fortement"). Feminine forms need five letters ("note" is not "not").
+    """
+    forms: List[str] = []
+    if len(token) <= 3:
+        return forms
+    singular = token
+    if token[-1] == "s":
+        singular = token[:-1]
+        forms.append(singular)
+        if token[-2] == "e":
+            forms.append(token[:-2])
+    if singular[-1] == "e" and len(singular) > 4:
+        masculine = singular[:-2] if singular[-3:] in ("nne", "lle") else singular[:-1]
+        if masculine not in forms:
+            forms.append(masculine)
+    return forms
+
+
+def phrase_tokens(phrase: str) -> Tuple[str, ...]:
+    """Word tokens of a lexicon phrase ("pas d'" -> ('pas', 'd')), tokenized like documents."""
+    return tuple(t for t in tokenize(phrase) if t not in PUNCTUATION)
+
+
+class TokenIndex:
+    """Tokens of one document and a token -> positions index, built in one pass.
+
+    Punctuation tokens keep their position (so phrases never match across them) but are
+    not indexed. Words are indexed under their word_forms() as well, so a lexicon word
+    matches its plural and feminine but never a word that merely contains it. With
+    keep_case=True, cased holds the same tokens before lowercasing (e.g. for
+    CompanyMatcher.find_tokens); otherwise it is None.
+    """
+
+    __slots__ = ("tokens", "positions", "cased")
+
+    def __init__(self, text: str, keep_case: bool = False):
+        if keep_case:
+            self.cased = tokenize(text, keep_case=True)
+            self.tokens = [token.lower() for token in self.cased]
+        else:
+            self.cased = None
+            self.tokens = tokenize(text)
+        positions: Dict[str, List[int]] = {}
+        for i, token in enumerate(self.tokens):
+            if token not in PUNCTUATION:
+                positions.setdefault(token, []).append(i)
+                if token[-1] in "es" and len(token) > 3:
+                    for form in word_forms(token):
+                        positions.setdefault(form, []).append(i)
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def sentence(self, position: int) -> Tuple[int, int]:
+        """(start, end) token range of the sentence containing position."""
+        tokens = self.tokens
+        start = position
+        while start > 0 and tokens[start - 1] not in SENTENCE_END:
+            start -= 1
+        end = position
+        while end < len(tokens) and tokens[end] not in SENTENCE_END:
+            end += 1
+        return start, min(end + 1, len(tokens))
+
+    def find(self, phrase: Tuple[str, ...]) -> List[int]:
+        """Start positions of every occurrence of a token phrase."""
+        starts = self.positions.get(phrase[0])
+        if not starts or len(phrase) == 1:
+            return starts or []
+        rest = phrase[1:]
+        tokens = self.tokens
+        return [p for p in starts if tuple(tokens[p + 1:p + len(phrase)]) == rest]